@@ -33,6 +33,12 @@ config.check()
 tasks = []
 boot = time.time()
 
+from anony.core.metrics import Metrics
+metrics = Metrics()
+
+from anony.core.workers import Workers
+workers = Workers()
+
 from anony.core.bot import Bot
 app = Bot()
 
@@ -48,13 +54,35 @@ db = MongoDB()
 from anony.core.lang import Language
 lang = Language()
 
+from anony.core.editor import Editor
+editor = Editor()
+
+from anony.core.server import Server
+server = Server()
+
+from anony.core.watchdog import Watchdog
+watchdog = Watchdog()
+
+from anony.core.profiler import Profiler
+profiler = Profiler()
+
+from anony.core.store import MediaStore
+store = MediaStore()
+
+from anony.core.broadcast import Broadcast
+broadcast = Broadcast()
+
 from anony.core.telegram import Telegram
 from anony.core.youtube import YouTube
 tg = Telegram()
 yt = YouTube()
 
-from anony.helpers import Queue
+from anony.helpers import Clock, Queue
 queue = Queue()
+clock = Clock()
+
+from anony.core.transcode import Transcoder
+transcoder = Transcoder()
 
 from anony.core.calls import TgCall
 anon = TgCall()
@@ -62,6 +90,7 @@ anon = TgCall()
 
 async def stop() -> None:
     logger.info("Stopping...")
+    watchdog.exit()
     for task in tasks:
         task.cancel()
         try:
@@ -69,8 +98,11 @@ async def stop() -> None:
         except Exception:
             pass
 
+    await server.exit()
+    store.exit()
     await app.exit()
     await userbot.exit()
     await db.close()
+    workers.exit()
 
     logger.info("Stopped.\n")
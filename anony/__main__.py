@@ -5,37 +5,86 @@
 
 import asyncio
 import importlib
+import inspect
+import time
 
 from pyrogram import idle
 
-from anony import (anon, app, config, db,
-                   logger, stop, userbot, yt)
+from anony import (anon, app, broadcast, config, db, editor, logger,
+                   metrics, server, stop, store, userbot, watchdog, workers,
+                   yt)
 from anony.plugins import all_modules
 
 
-async def main():
-    await db.connect()
-    await app.boot()
-    await userbot.boot()
-    await anon.boot()
-
+async def load_plugins() -> None:
     for module in all_modules:
         importlib.import_module(f"anony.plugins.{module}")
     logger.info(f"Loaded {len(all_modules)} modules.")
 
+
+async def load_cookies() -> None:
     if config.COOKIES_URL:
         await yt.save_cookies(config.COOKIES_URL)
 
+
+async def load_sudoers() -> None:
     sudoers = await db.get_sudoers()
     app.sudoers.update(sudoers)
     app.bl_users.update(await db.get_blacklisted())
     logger.info(f"Loaded {len(app.sudoers)} sudo users.")
 
+
+# name: (function, stages it depends on)
+STAGES = {
+    "store": (store.load, ()),
+    "editor": (editor.boot, ()),
+    "metrics": (metrics.boot, ()),
+    "watchdog": (watchdog.boot, ("metrics",)),
+    "database": (db.connect, ()),
+    "bot": (app.boot, ()),
+    "server": (server.boot, ()),
+    "assistants": (userbot.boot, ()),
+    "calls": (anon.boot, ("assistants",)),
+    "plugins": (load_plugins, ("database", "bot", "calls", "server", "store", "editor")),
+    "cookies": (load_cookies, ()),
+    "sudoers": (load_sudoers, ("database", "bot")),
+    "broadcast": (broadcast.boot, ("database", "plugins")),
+}
+
+
+async def boot(stages: dict) -> None:
+    """
+    Run the boot stages, each one as soon as the stages it depends
+    on are done, and log how long every stage took. Stages are plain
+    functions or coroutine functions.
+    """
+    started = time.monotonic()
+    running = {}
+
+    async def run(name: str) -> None:
+        func, deps = stages[name]
+        await asyncio.gather(*(running[dep] for dep in deps))
+        start = time.monotonic()
+        result = func()
+        if inspect.isawaitable(result):
+            await result
+        logger.info(f"Boot stage '{name}' finished in {time.monotonic() - start:.2f}s.")
+
+    for name in stages:
+        running[name] = asyncio.create_task(run(name))
+    await asyncio.gather(*running.values())
+    logger.info(f"Booted in {time.monotonic() - started:.2f}s.")
+
+
+async def main():
+    await boot(STAGES)
+
     await idle()
     await stop()
 
 
 if __name__ == "__main__":
+    workers.boot()
     try:
         asyncio.get_event_loop().run_until_complete(main())
     except KeyboardInterrupt:
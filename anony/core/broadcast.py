@@ -0,0 +1,226 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+import time
+from io import BytesIO
+
+from pyrogram import errors, types
+
+from anony import app, config, db, editor, lang, logger, metrics, tasks
+from anony.helpers import TokenBucket
+
+# Failures that will never go away for the target, they get removed from the db.
+# 401 errors are about the bot's own account and abort the broadcast instead.
+DEAD = (
+    errors.ChannelInvalid,
+    errors.ChannelPrivate,
+    errors.ChatForbidden,
+    errors.ChatIdInvalid,
+    errors.InputUserDeactivated,
+    errors.UserIsBlocked,
+    errors.UserIsBot,
+    errors.UserKicked,
+)
+
+
+class Broadcast:
+    def __init__(self, workers: int = 16, checkpoint: float = 5):
+        """
+        Broadcast job engine.
+
+        Targets are sent to in a fixed order (groups, then users, by id) by a
+        pool of workers sharing one token bucket. The lowest target still
+        in flight is saved to Mongo every `checkpoint` seconds, so a job
+        interrupted by a restart resumes from there at boot.
+        """
+        self.size = workers
+        self.checkpoint = checkpoint
+        self.bucket = TokenBucket(config.BROADCAST_RATE)
+        self.job: dict | None = None
+        self.task: asyncio.Task | None = None
+
+    @property
+    def active(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    async def targets(self, job: dict) -> list[tuple[int, int]]:
+        targets = []
+        if job["groups"]:
+            targets.extend((0, chat_id) for chat_id in await db.get_chats())
+        if job["users"]:
+            targets.extend((1, user_id) for user_id in await db.get_users())
+        cursor = tuple(job["cursor"]) if job["cursor"] else None
+        skip = {tuple(target) for target in job.get("skip", [])}
+        return sorted(
+            t for t in set(targets) if (not cursor or t >= cursor) and t not in skip
+        )
+
+    async def start(
+        self, msg: types.Message, status: types.Message, groups: bool, users: bool, copy: bool
+    ) -> None:
+        self.job = {
+            "_id": f"{status.chat.id}:{status.id}",
+            "chat_id": status.chat.id,
+            "status_id": status.id,
+            "from_chat": msg.chat.id,
+            "message_id": msg.id,
+            "groups": groups,
+            "users": users,
+            "copy": copy,
+            "cursor": None,
+            "count": 0,
+            "ucount": 0,
+            "failed": 0,
+            "total": 0,
+            "started": time.time(),
+        }
+        await db.save_broadcast(self.job)
+        self.task = asyncio.create_task(self.run(msg))
+        tasks.append(self.task)
+
+    def stop(self) -> None:
+        if self.job:
+            self.job["stopped"] = True
+
+    async def send(self, msg: types.Message, chat_id: int) -> None:
+        if self.job["copy"]:
+            await msg.copy(chat_id, reply_markup=msg.reply_markup)
+        else:
+            await msg.forward(chat_id)
+
+    async def prune(self, dead: list[tuple[int, int]]) -> None:
+        """Remove the dead targets from the db in one batch per collection."""
+        chats = [target[1] for target in dead if target[0] == 0]
+        users = [target[1] for target in dead if target[0] == 1]
+        dead.clear()
+        if chats:
+            await db.rm_chats(chats)
+        if users:
+            await db.rm_users(users)
+        if chats or users:
+            logger.info(f"Removed {len(chats)} dead chats and {len(users)} dead users.")
+
+    async def run(self, msg: types.Message) -> None:
+        job = self.job
+        _lang = await lang.get_lang(job["chat_id"])
+        targets = await self.targets(job)
+        job["total"] = job["total"] or len(targets)
+        done = job["total"] - len(targets)
+        position, pending, finished, failed, dead = 0, set(), set(), [], []
+        aborted = None
+        iterator = iter(targets)
+
+        def checkpoint() -> None:
+            # Everything before the cursor is done, `skip` holds the targets
+            # after it that finished while an earlier one was still in flight.
+            if pending:
+                cursor = min(pending)
+            else:
+                cursor = targets[position] if position < len(targets) else None
+            finished.difference_update({t for t in finished if not cursor or t < cursor})
+            job["cursor"] = list(cursor) if cursor else None
+            job["skip"] = [list(t) for t in finished]
+
+        def progress() -> None:
+            editor.edit(
+                job["chat_id"],
+                job["status_id"],
+                _lang["gcast_progress"].format(
+                    done, job["total"], job["count"], job["ucount"], job["failed"]
+                ),
+            )
+
+        async def save() -> None:
+            while True:
+                await asyncio.sleep(self.checkpoint)
+                checkpoint()
+                await db.save_broadcast(job)
+                await self.prune(dead)
+                progress()
+
+        async def worker() -> None:
+            nonlocal aborted, done, position
+            for target in iterator:
+                position += 1
+                pending.add(target)
+                while not job.get("stopped"):
+                    if aborted:
+                        return
+                    await self.bucket.acquire()
+                    try:
+                        await self.send(msg, target[1])
+                        job["ucount" if target[0] else "count"] += 1
+                    except errors.Unauthorized as ex:
+                        # The target stays pending, so the job resumes from it.
+                        aborted = ex
+                        return
+                    except errors.FloodWait as fw:
+                        metrics.floodwaits.inc(source="broadcast")
+                        self.bucket.pause(fw.value)
+                        continue
+                    except DEAD as ex:
+                        job["failed"] += 1
+                        failed.append(f"{target[1]} - {ex}")
+                        dead.append(target)
+                    except Exception as ex:
+                        job["failed"] += 1
+                        failed.append(f"{target[1]} - {ex}")
+                    break
+                pending.discard(target)
+                finished.add(target)
+                done += 1
+                if job.get("stopped"):
+                    return
+
+        progress()
+        saver = asyncio.create_task(save())
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.size)))
+        except asyncio.CancelledError:
+            # Shutting down, keep the job so it resumes at the next boot.
+            checkpoint()
+            await db.save_broadcast(job)
+            await self.prune(dead)
+            raise
+        finally:
+            saver.cancel()
+            self.job = None
+        if aborted:
+            # Every send would fail the same way, keep the job for the next boot.
+            checkpoint()
+            await db.save_broadcast(job)
+            await self.prune(dead)
+            return logger.error(f"Broadcast aborted, the bot can't send messages: {aborted}")
+        await db.rm_broadcast(job["_id"])
+        await self.prune(dead)
+
+        editor.cancel(job["chat_id"], job["status_id"])
+        text = _lang["gcast_stopped" if job.get("stopped") else "gcast_end"].format(
+            job["count"], job["ucount"]
+        )
+        if failed:
+            report = BytesIO("\n".join(failed).encode())
+            report.name = "errors.txt"
+            await app.send_document(job["chat_id"], report, caption=text)
+        await app.edit_message_text(job["chat_id"], job["status_id"], text)
+        logger.info(f"Broadcast finished in {time.time() - job['started']:.0f}s.")
+
+    async def boot(self) -> None:
+        """Resume the broadcast that was running when the bot stopped, if any."""
+        job = await db.get_broadcast()
+        if not job:
+            return
+        try:
+            msg = await app.get_messages(job["from_chat"], job["message_id"])
+        except Exception:
+            msg = None
+        if not msg or msg.empty:
+            return await db.rm_broadcast(job["_id"])
+
+        self.job = job
+        self.task = asyncio.create_task(self.run(msg))
+        tasks.append(self.task)
+        logger.info(f"Resuming broadcast from {job['cursor']}.")
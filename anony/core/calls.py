@@ -3,34 +3,167 @@
 # This file is part of AnonXMusic
 
 import asyncio
-from ntgcalls import (ConnectionNotFound, TelegramServerError,
+import copy
+import os
+import shlex
+import time
+from random import randint
+
+from ntgcalls import (ConnectionNotFound, MediaSource, TelegramServerError,
                       RTMPStreamingUnsupported, ConnectionError)
+from pyrogram import errors, raw
 from pyrogram.errors import (ChatSendMediaForbidden, ChatSendPhotosForbidden,
                              MessageIdInvalid)
 from pyrogram.types import InputMediaPhoto, Message
 from pytgcalls import PyTgCalls, exceptions, types
 from pytgcalls.pytgcalls_session import PyTgCallsSession
+from pytgcalls.types.raw import Stream
 
-from anony import app, config, db, lang, logger, queue, userbot, yt
+from anony import (app, clock, config, db, lang, logger, metrics, queue,
+                   server, tasks, transcoder, userbot, yt)
+from anony.core.quality import Quality
 from anony.helpers import Media, Track, buttons, thumb
 
 class TgCall(PyTgCalls):
     def __init__(self):
         self.clients = []
+        self.unhealthy = set()
+        self.flood_until = {}
+        self.participants = {}
+        self.preloads = {}
+        self.prepared = {}
+        self.streams = {}
+        self.quality = Quality()
+        self.actors = {}
+        self.inbox = {}
+        self.running = {}
+
+        metrics.gauge(
+            "anony_active_calls", "Active calls per assistant.", ("assistant",),
+            func=self.call_counts,
+        )
+        metrics.gauge(
+            "anony_queued_tracks", "Tracks in all the queues.",
+            func=lambda: sum(len(items) for items in queue.queues.values()),
+        )
+
+    def call_counts(self) -> dict[int, int]:
+        counts = {num: 0 for num in range(1, len(self.clients) + 1)}
+        for chat_id in db.active_calls:
+            num = db.assistant.get(chat_id)
+            if num:
+                counts[num] = counts.get(num, 0) + 1
+        return counts
+
+    async def dispatch(self, chat_id: int, action: str, *args):
+        """
+        Run a playback operation through the actor of the chat.
+
+        Operations on one chat run one at a time in arrival order, and
+        ones made redundant by a later operation are dropped unrun.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.inbox.setdefault(chat_id, []).append((action, args, future))
+        if chat_id not in self.actors:
+            self.actors[chat_id] = asyncio.create_task(self.actor(chat_id))
+        return await future
+
+    def redundant(self, chat_id: int, action: str, args: tuple, inbox: list) -> bool:
+        if action != "stop" and any(op[0] == "stop" for op in inbox):
+            return True
+        if action == "play_next":
+            # Skips and stream ends aimed at a media that already changed.
+            return args[0] is not queue.get_current(chat_id)
+        if action in ("seek", "replay"):
+            return any(op[0] == action for op in inbox)
+        return False
+
+    async def actor(self, chat_id: int) -> None:
+        inbox = self.inbox[chat_id]
+        try:
+            while inbox:
+                action, args, future = inbox.pop(0)
+                result = None
+                try:
+                    if not self.redundant(chat_id, action, args, inbox):
+                        self.running[chat_id] = action
+                        result = await getattr(self, f"_{action}")(chat_id, *args)
+                except Exception as ex:
+                    if not future.done():
+                        future.set_exception(ex)
+                    continue
+                finally:
+                    self.running.pop(chat_id, None)
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.actors.pop(chat_id, None)
+            self.inbox.pop(chat_id, None)
+            self.running.pop(chat_id, None)
 
     async def pause(self, chat_id: int) -> bool:
+        return await self.dispatch(chat_id, "pause")
+
+    async def resume(self, chat_id: int) -> bool:
+        return await self.dispatch(chat_id, "resume")
+
+    async def stop(self, chat_id: int) -> None:
+        await self.dispatch(chat_id, "stop")
+
+    async def play_media(
+        self,
+        chat_id: int,
+        message: Message | None,
+        media: Media | Track,
+        seek_time: int = 0,
+    ) -> None:
+        await self.dispatch(chat_id, "play_media", message, media, seek_time)
+
+    async def seek(self, chat_id: int, message: Message, seek_time: int) -> None:
+        await self.dispatch(chat_id, "seek", message, seek_time)
+
+    async def replay(self, chat_id: int) -> None:
+        await self.dispatch(chat_id, "replay")
+
+    async def play_next(self, chat_id: int) -> None:
+        # _play_next pops the queue as soon as it starts, so a skip made
+        # during a transition would point at the track being started.
+        if self.running.get(chat_id) == "play_next" or any(
+            op[0] == "play_next" for op in self.inbox.get(chat_id, [])
+        ):
+            return
+        await self.dispatch(chat_id, "play_next", queue.get_current(chat_id))
+
+    async def force_play(self, chat_id: int, item_id: str) -> bool:
+        return await self.dispatch(chat_id, "force_play", item_id)
+
+    async def migrate(self, chat_id: int) -> bool:
+        return await self.dispatch(chat_id, "migrate")
+
+    async def _pause(self, chat_id: int) -> bool:
         client = await db.get_assistant(chat_id)
         await db.playing(chat_id, paused=True)
+        clock.pause(chat_id)
         return await client.pause(chat_id)
 
-    async def resume(self, chat_id: int) -> bool:
+    async def _resume(self, chat_id: int) -> bool:
         client = await db.get_assistant(chat_id)
         await db.playing(chat_id, paused=False)
+        clock.resume(chat_id)
         return await client.resume(chat_id)
 
-    async def stop(self, chat_id: int) -> None:
+    async def _stop(self, chat_id: int) -> None:
         client = await db.get_assistant(chat_id)
+        items = queue.get_queue(chat_id)
         queue.clear(chat_id)
+        server.release(*items)
+        clock.stop(chat_id)
+        self.participants.pop(chat_id, None)
+        self.prepared.pop(chat_id, None)
+        self.streams.pop(chat_id, None)
+        task = self.preloads.pop(chat_id, None)
+        if task:
+            task.cancel()
         await db.remove_call(chat_id)
 
         try:
@@ -38,36 +171,31 @@ class TgCall(PyTgCalls):
         except Exception:
             pass
 
-    async def play_media(
-        self,
-        chat_id: int,
-        message: Message,
-        media: Media | Track,
-        seek_time: int = 0,
-    ) -> None:
-        client = await db.get_assistant(chat_id)
-        _lang = await lang.get_lang(chat_id)
-        _thumb = (
-            await thumb.generate(media)
-            if isinstance(media, Track)
-            else config.DEFAULT_THUMB
-        ) if config.THUMB_GEN else None
-
-        if not media.file_path:
-            await message.edit_text(_lang["error_no_file"].format(config.SUPPORT_CHAT))
-            return await self.play_next(chat_id)
+    def assistant_load(self, chat_id: int) -> int:
+        """Weighted number of other calls on the assistant of the chat."""
+        num = db.assistant.get(chat_id)
+        load = 0
+        for _chat in db.active_calls:
+            if _chat != chat_id and db.assistant.get(_chat) == num:
+                media = queue.get_current(_chat)
+                load += 4 if media and media.video else 1
+        return load
 
+    def build_stream(
+        self, media: Media | Track, seek_time: int = 0, chat_id: int = None
+    ) -> types.MediaStream:
+        audio, video = self.quality.get(self.assistant_load(chat_id))
         ffmpeg_params = ""
         if str(media.file_path).startswith("http"):
             ffmpeg_params = "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5"
-            
+
         if seek_time > 1:
             ffmpeg_params += f" -ss {seek_time}"
 
-        stream = types.MediaStream(
+        return types.MediaStream(
             media_path=media.file_path,
-            audio_parameters=types.AudioQuality.HIGH,
-            video_parameters=types.VideoQuality.HD_720p,
+            audio_parameters=audio,
+            video_parameters=video,
             audio_flags=types.MediaStream.Flags.REQUIRED,
             video_flags=(
                 types.MediaStream.Flags.AUTO_DETECT
@@ -76,102 +204,463 @@ class TgCall(PyTgCalls):
             ),
             ffmpeg_parameters=ffmpeg_params if ffmpeg_params else None,
         )
+
+    def is_ready(self, media: Media | Track) -> bool:
+        """Check whether the media can be streamed without downloading it first."""
+        if not media.file_path:
+            return False
+        if isinstance(media, Track):
+            return os.path.exists(media.file_path)
+        return True
+
+    async def notify(self, chat_id: int, message: Message | None, text: str) -> None:
+        if message:
+            await message.edit_text(text)
+        else:
+            await app.send_message(chat_id=chat_id, text=text)
+
+    async def announce(
+        self, chat_id: int, message: Message | None, media: Media | Track, _lang: dict
+    ) -> None:
+        """Edit the given message, or send a new one, to show the now playing media."""
+        _thumb = (
+            await thumb.generate(media)
+            if isinstance(media, Track)
+            else config.DEFAULT_THUMB
+        ) if config.THUMB_GEN else None
+        text = _lang["play_media"].format(
+            media.url,
+            media.title,
+            media.duration,
+            media.user,
+        )
+        keyboard = buttons.controls(chat_id)
+        if message:
+            try:
+                if _thumb:
+                    await message.edit_media(
+                        media=InputMediaPhoto(
+                            media=_thumb,
+                            caption=text,
+                        ),
+                        reply_markup=keyboard,
+                    )
+                else:
+                    await message.edit_text(text, reply_markup=keyboard)
+                return
+            except (ChatSendMediaForbidden, ChatSendPhotosForbidden, MessageIdInvalid):
+                pass
+
+        sent = None
+        if _thumb:
+            try:
+                sent = await app.send_photo(
+                    chat_id=chat_id,
+                    photo=_thumb,
+                    caption=text,
+                    reply_markup=keyboard,
+                )
+            except (ChatSendMediaForbidden, ChatSendPhotosForbidden):
+                pass
+        if not sent:
+            sent = await app.send_message(
+                chat_id=chat_id,
+                text=text,
+                reply_markup=keyboard,
+            )
+        media.message_id = sent.id
+
+    async def _play_media(
+        self,
+        chat_id: int,
+        message: Message | None,
+        media: Media | Track,
+        seek_time: int = 0,
+        stream: Stream = None,
+    ) -> None:
+        """
+        Stream the media in the chat. The now playing message is edited
+        into `message`, or sent as a new message when it's None, only after
+        the stream has switched.
+        """
+        client = await db.get_assistant(chat_id)
+        _lang = await lang.get_lang(chat_id)
+
+        if not media.file_path:
+            await self.notify(chat_id, message, _lang["error_no_file"].format(config.SUPPORT_CHAT))
+            return await self._play_next(chat_id)
+
+        if not stream and not seek_time:
+            stream = transcoder.get_stream(media)
+        stream = stream or self.build_stream(media, seek_time, chat_id)
         try:
+            start = time.perf_counter()
             await client.play(
                 chat_id=chat_id,
                 stream=stream,
                 config=types.GroupCallConfig(auto_start=False),
             )
-            if not seek_time:
-                media.time = 1
-                await db.add_call(chat_id)
-                text = _lang["play_media"].format(
-                    media.url,
-                    media.title,
-                    media.duration,
-                    media.user,
-                )
-                keyboard = buttons.controls(chat_id)
-                try:
-                    if _thumb:
-                        await message.edit_media(
-                            media=InputMediaPhoto(
-                                media=_thumb,
-                                caption=text,
-                            ),
-                            reply_markup=keyboard,
-                        )
-                    else:
-                        await message.edit_text(text, reply_markup=keyboard)
-                except (ChatSendMediaForbidden, ChatSendPhotosForbidden, MessageIdInvalid):
-                    if _thumb:
-                        sent = await app.send_photo(
-                            chat_id=chat_id,
-                            photo=_thumb,
-                            caption=text,
-                            reply_markup=keyboard,
-                        )
-                    else:
-                        sent = await app.send_message(
-                            chat_id=chat_id,
-                            text=text,
-                            reply_markup=keyboard,
-                        )
-                    media.message_id = sent.id
         except FileNotFoundError:
-            await message.edit_text(_lang["error_no_file"].format(config.SUPPORT_CHAT))
-            await self.play_next(chat_id)
+            await self.notify(chat_id, message, _lang["error_no_file"].format(config.SUPPORT_CHAT))
+            return await self._play_next(chat_id)
         except exceptions.NoActiveGroupCall:
-            await self.stop(chat_id)
-            await message.edit_text(_lang["error_no_call"])
+            await self._stop(chat_id)
+            return await self.notify(chat_id, message, _lang["error_no_call"])
         except exceptions.NoAudioSourceFound:
-            await message.edit_text(_lang["error_no_audio"])
-            await self.play_next(chat_id)
+            await self.notify(chat_id, message, _lang["error_no_audio"])
+            return await self._play_next(chat_id)
+        except errors.FloodWait as fw:
+            # Only the assistant's own play call gets here, FloodWaits of
+            # the bot's messages are handled below and never fail the call.
+            metrics.floodwaits.inc(source="calls")
+            num = db.assistant.get(chat_id)
+            self.flood_until[num] = time.time() + fw.value
+            if await self.recover(chat_id, message, media, seek_time):
+                return
+            await self._stop(chat_id)
+            return await self.notify(chat_id, message, _lang["error_tg_server"])
         except (ConnectionError, ConnectionNotFound, TelegramServerError):
-            await self.stop(chat_id)
-            await message.edit_text(_lang["error_tg_server"])
+            if await self.recover(chat_id, message, media, seek_time):
+                return
+            await self._stop(chat_id)
+            return await self.notify(chat_id, message, _lang["error_tg_server"])
         except RTMPStreamingUnsupported:
-            await self.stop(chat_id)
-            await message.edit_text(_lang["error_rtmp"])
+            await self._stop(chat_id)
+            return await self.notify(chat_id, message, _lang["error_rtmp"])
 
-    async def replay(self, chat_id: int) -> None:
+        metrics.plays.observe(time.perf_counter() - start)
+        clock.start(chat_id, seek_time)
+        if seek_time:
+            self.streams.pop(chat_id, None)
+            return
+        self.streams[chat_id] = (media, stream)
+        transcoder.schedule(media)
+        await db.add_call(chat_id)
+        self.preload_next(chat_id)
+        try:
+            await self.announce(chat_id, message, media, _lang)
+        except errors.FloodWait as fw:
+            metrics.floodwaits.inc(source="announce")
+            logger.warning(f"FloodWait of {fw.value}s announcing the media in {chat_id}.")
+        except Exception as ex:
+            logger.warning(f"Failed to announce the media in {chat_id}: {ex}")
+
+    async def _seek(self, chat_id: int, message: Message, seek_time: int) -> None:
+        """
+        Seek the current media without going through play_media again.
+
+        The ffmpeg commands probed when the media started are reused with
+        an input side `-ss`, so ffmpeg jumps through the container index
+        to the nearest keyframe. There is no new probe, thumbnail or
+        message.
+        """
+        media = queue.get_current(chat_id)
+        if not media:
+            # The call ended while the seek was waiting its turn.
+            return
+        if not await db.playing(chat_id):
+            # A pause got in ahead of the seek. Playing from the new position
+            # resumes the call, so the clock and the status resume with it.
+            await db.playing(chat_id, paused=False)
+            clock.resume(chat_id)
+        current = self.streams.get(chat_id)
+        if (
+            not current
+            or current[0] is not media
+            or current[1].microphone.media_source == MediaSource.FILE
+        ):
+            # Transcoded PCM can't be seeked, play the original from there.
+            return await self._play_media(chat_id, message, media, seek_time)
+
+        def _seek(source):
+            if not source:
+                return source
+            source = copy.copy(source)
+            command = shlex.split(source.path)
+            source.path = shlex.join(command[:1] + ["-ss", str(seek_time)] + command[1:])
+            return source
+
+        client = await db.get_assistant(chat_id)
+        stream = Stream(
+            microphone=_seek(current[1].microphone),
+            camera=_seek(current[1].camera),
+        )
+        try:
+            await client.play(
+                chat_id=chat_id,
+                stream=stream,
+                config=types.GroupCallConfig(auto_start=False),
+            )
+        except Exception:
+            return await self._play_media(chat_id, message, media, seek_time)
+        clock.seek(chat_id, seek_time)
+
+    async def _replay(self, chat_id: int) -> None:
         if not await db.get_call(chat_id):
             return
 
         media = queue.get_current(chat_id)
         _lang = await lang.get_lang(chat_id)
         msg = await app.send_message(chat_id=chat_id, text=_lang["play_again"])
-        await self.play_media(chat_id, msg, media)
+        await self._play_media(chat_id, msg, media)
 
-    async def play_next(self, chat_id: int) -> None:
-        media = queue.get_next(chat_id)
+    async def _force_play(self, chat_id: int, item_id: str) -> bool:
+        """Move a queued item to the front and play it. Returns False if it's gone."""
+        pos, media = queue.check_item(chat_id, item_id)
+        if not media or pos == -1:
+            return False
+        if pos == 0:
+            return True
+
+        current = queue.get_current(chat_id)
+        m_id = current.message_id
+        queue.force_add(chat_id, media, remove=pos)
+        server.release(current)
+        try:
+            await app.delete_messages(
+                chat_id=chat_id, message_ids=[m_id, media.message_id], revoke=True
+            )
+            media.message_id = None
+        except Exception:
+            pass
+
+        _lang = await lang.get_lang(chat_id)
+        msg = await app.send_message(chat_id=chat_id, text=_lang["play_next"])
+        if not self.is_ready(media):
+            media.file_path = await yt.download(media.id, video=media.video)
+        media.message_id = msg.id
+        await self._play_media(chat_id, msg, media)
+        return True
+
+    def preload_next(self, chat_id: int, ahead: int = 45) -> None:
+        """
+        Schedule the next media in the queue to be prepared `ahead`
+        seconds before the current one ends.
+        """
+        task = self.preloads.pop(chat_id, None)
+        if task:
+            task.cancel()
+
+        media = queue.get_current(chat_id)
+        if not media or not queue.get_next(chat_id, check=True):
+            return
+        delay = max(media.duration_sec - clock.position(chat_id) - ahead, 0)
+        self.preloads[chat_id] = asyncio.create_task(self.preload(chat_id, delay))
+
+    async def preload(self, chat_id: int, delay: int = 0) -> None:
+        """Download, probe and build the stream of the next media in the queue."""
+        await asyncio.sleep(delay)
+        self.preloads.pop(chat_id, None)
+        media = queue.get_next(chat_id, check=True)
+        if not media or self.prepared.get(chat_id, (None,))[0] is media:
+            return
         try:
-            if media.message_id:
+            if not self.is_ready(media):
+                media.file_path = await yt.download(media.id, video=media.video)
+                if not media.file_path:
+                    return
+            if isinstance(media, Track) and config.THUMB_GEN:
+                await thumb.generate(media)
+
+            stream = transcoder.get_stream(media)
+            if not stream:
+                stream = self.build_stream(media, chat_id=chat_id)
+                await stream.check_stream()
+                stream = Stream(microphone=stream.microphone, camera=stream.camera)
+            self.prepared[chat_id] = (media, stream)
+        except Exception as ex:
+            logger.debug(f"Failed to prepare next media in {chat_id}: {ex}")
+
+    async def _play_next(self, chat_id: int, current: Media | Track = None) -> None:
+        ended = queue.get_current(chat_id)
+        media = queue.get_next(chat_id)
+        server.release(ended)
+        if not media:
+            return await self._stop(chat_id)
+
+        prepared = self.prepared.pop(chat_id, None)
+        stream = (
+            prepared[1]
+            if prepared and prepared[0] is media and self.is_ready(media)
+            else None
+        )
+        queued_id, media.message_id = media.message_id, 0
+
+        async def delete_queued() -> None:
+            if not queued_id:
+                return
+            try:
                 await app.delete_messages(
                     chat_id=chat_id,
-                    message_ids=media.message_id,
+                    message_ids=queued_id,
                     revoke=True,
                 )
-                media.message_id = 0
-        except Exception:
-            pass
+            except Exception:
+                pass
 
-        if not media:
-            return await self.stop(chat_id)
+        if stream or self.is_ready(media):
+            await asyncio.gather(
+                self._play_media(chat_id, None, media, stream=stream),
+                delete_queued(),
+            )
+            return
 
         _lang = await lang.get_lang(chat_id)
-        msg = await app.send_message(chat_id=chat_id, text=_lang["play_next"])
-        
-        # 🔥 FRESH DOWNLOAD ON SKIP 🔥
+        msg, _ = await asyncio.gather(
+            app.send_message(chat_id=chat_id, text=_lang["play_next"]),
+            delete_queued(),
+        )
         media.file_path = await yt.download(media.id, video=media.video)
         if not media.file_path:
-            await self.stop(chat_id)
+            await self._stop(chat_id)
             return await msg.edit_text(
                 _lang["error_no_file"].format(config.SUPPORT_CHAT)
             )
 
         media.message_id = msg.id
-        await self.play_media(chat_id, msg, media)
+        await self._play_media(chat_id, msg, media)
+
+    async def is_healthy(self, num: int) -> bool:
+        """Check whether the assistant behind the given number can still serve calls."""
+        if time.time() < self.flood_until.get(num, 0):
+            return False
+        ub = userbot.clients[num - 1]
+        if not ub.is_connected:
+            return False
+        try:
+            await asyncio.wait_for(
+                ub.invoke(raw.functions.Ping(ping_id=randint(0, 2**31))), timeout=10
+            )
+            return True
+        except errors.FloodWait as fw:
+            self.flood_until[num] = time.time() + fw.value
+            return False
+        except Exception:
+            return False
+
+    async def recover(
+        self, chat_id: int, message: Message, media: Media | Track, seek_time: int = 0
+    ) -> bool:
+        """Move a call whose assistant just failed, if the assistant is really unhealthy."""
+        num = db.assistant.get(chat_id)
+        if not num or len(self.clients) < 2 or await self.is_healthy(num):
+            return False
+
+        self.unhealthy.add(num)
+        logger.warning(f"Assistant {num} is unhealthy, moving chat {chat_id}.")
+        try:
+            return await self._migrate(chat_id, message, media, seek_time)
+        except Exception as ex:
+            logger.error(f"Failed to move chat {chat_id}: {ex}")
+            return False
+
+    async def _migrate(
+        self,
+        chat_id: int,
+        message: Message = None,
+        media: Media | Track = None,
+        seek_time: int = None,
+    ) -> bool:
+        """
+        Move a call to the least loaded healthy assistant. Without an explicit
+        seek time the current media resumes from where it was.
+        """
+        old = db.assistant.get(chat_id)
+        media = media or queue.get_current(chat_id)
+        candidates = [
+            num for num in range(1, len(self.clients) + 1)
+            if num != old and num not in self.unhealthy
+        ]
+        if not media or not candidates:
+            return False
+
+        load = {num: 0 for num in candidates}
+        for _chat in db.active_calls:
+            if db.assistant.get(_chat) in load:
+                load[db.assistant[_chat]] += 1
+        num = min(candidates, key=load.get)
+
+        try:
+            await self.clients[old - 1].leave_call(chat_id, close=False)
+        except Exception:
+            pass
+
+        await db.set_assistant(chat_id, num)
+        self.participants.pop(chat_id, None)
+        ub = userbot.clients[num - 1]
+        try:
+            await app.get_chat_member(chat_id, ub.id)
+        except errors.UserNotParticipant:
+            try:
+                chat = await app.get_chat(chat_id)
+                invite_link = (
+                    chat.username
+                    or chat.invite_link
+                    or await app.export_chat_invite_link(chat_id)
+                )
+                await ub.join_chat(invite_link)
+            except errors.UserAlreadyParticipant:
+                pass
+            except Exception as ex:
+                logger.error(f"Assistant {num} failed to join {chat_id}: {ex}")
+                return False
+        except Exception:
+            pass
+
+        if seek_time is None:
+            seek_time = max(clock.position(chat_id), 2)
+        await self._play_media(chat_id, message, media, seek_time)
+        if not await db.playing(chat_id):
+            clock.pause(chat_id)
+            await self.clients[num - 1].pause(chat_id)
+        logger.info(f"Moved chat {chat_id} from assistant {old} to {num}.")
+        return True
+
+    async def failover(self, num: int) -> None:
+        chats = [
+            chat_id for chat_id in list(db.active_calls)
+            if db.assistant.get(chat_id) == num
+        ]
+        if not chats:
+            return
+        logger.warning(f"Assistant {num} is unhealthy, moving {len(chats)} call(s).")
+        results = await asyncio.gather(
+            *(self.migrate(chat_id) for chat_id in chats), return_exceptions=True
+        )
+        for chat_id, moved in zip(chats, results):
+            if moved is not True:
+                await self.stop(chat_id)
+
+    async def monitor(self, sleep: int = 10) -> None:
+        while True:
+            await asyncio.sleep(sleep)
+            for num in range(1, len(self.clients) + 1):
+                if await self.is_healthy(num):
+                    if num in self.unhealthy:
+                        self.unhealthy.discard(num)
+                        logger.info(f"Assistant {num} is healthy again.")
+                    continue
+                if num not in self.unhealthy:
+                    self.unhealthy.add(num)
+                    try:
+                        await self.failover(num)
+                    except Exception as ex:
+                        logger.error(f"Failover of assistant {num} failed: {ex}")
+
+    async def participants_count(self, chat_id: int, ttl: int = 300) -> int:
+        """
+        Return the number of participants in the video chat.
+
+        The list is fetched once and then kept current from participant
+        updates, with a refetch every `ttl` seconds as a safety net.
+        """
+        cached = self.participants.get(chat_id)
+        if not cached or time.time() - cached[0] > ttl:
+            client = await db.get_assistant(chat_id)
+            participants = await client.get_participants(chat_id)
+            cached = (time.time(), {p.user_id for p in participants})
+            self.participants[chat_id] = cached
+        return len(cached[1])
 
     async def ping(self) -> float:
         pings = [client.ping for client in self.clients]
@@ -190,13 +679,31 @@ class TgCall(PyTgCalls):
                     types.ChatUpdate.Status.CLOSED_VOICE_CHAT,
                 ]:
                     await self.stop(update.chat_id)
+            elif isinstance(update, types.UpdatedGroupCallParticipant):
+                cached = self.participants.get(update.chat_id)
+                if not cached:
+                    return
+                if update.action & types.GroupCallParticipant.Action.JOINED:
+                    cached[1].add(update.participant.user_id)
+                elif update.action & (
+                    types.GroupCallParticipant.Action.LEFT
+                    | types.GroupCallParticipant.Action.KICKED
+                ):
+                    cached[1].discard(update.participant.user_id)
 
     async def boot(self) -> None:
         PyTgCallsSession.notice_displayed = True
-        for ub in userbot.clients:
+
+        async def start(ub) -> PyTgCalls:
             client = PyTgCalls(ub, cache_duration=100)
             await client.start()
-            self.clients.append(client)
             await self.decorators(client)
+            return client
+
+        self.clients.extend(await asyncio.gather(*(start(ub) for ub in userbot.clients)))
+        if len(self.clients) > 1:
+            tasks.append(asyncio.create_task(self.monitor()))
+        if not self.quality.fixed:
+            tasks.append(asyncio.create_task(self.quality.monitor()))
         logger.info("PyTgCalls client(s) started.")
       
@@ -16,6 +16,6 @@ def ensure_dirs():
     if not shutil.which("deno") or not shutil.which("ffmpeg"):
         raise RuntimeError("Deno and FFmpeg must be installed and accessible in the system PATH.")
 
-    for dir in ["cache", "downloads"]:
+    for dir in ["cache", "downloads", "storage/telegram"]:
         Path(dir).mkdir(parents=True, exist_ok=True)
     logger.info("Cache directories updated.")
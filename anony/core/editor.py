@@ -0,0 +1,106 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+import time
+
+from pyrogram import errors, types
+
+from anony import app, logger, metrics, tasks
+from anony.helpers import TokenBucket
+
+
+class Editor:
+    def __init__(self, workers: int = 4, chat_delay: float = 3, rate: float = 25):
+        """
+        Scheduler for outbound message edits.
+
+        Pending edits are kept per message and a newer edit replaces the
+        queued one, so only the latest state is ever sent. Edits are spaced
+        by `chat_delay` seconds within a chat, limited to `rate` per second
+        overall and sent by a fixed number of workers.
+        """
+        self.size = workers
+        self.chat_delay = chat_delay
+        self.bucket = TokenBucket(rate)
+        self.pending: dict[tuple[int, int], dict] = {}
+        self.next_edit: dict[int, float] = {}
+        self.queue = asyncio.Queue()
+
+    def edit(
+        self,
+        chat_id: int,
+        message_id: int,
+        text: str = None,
+        reply_markup: types.InlineKeyboardMarkup = None,
+    ) -> None:
+        """Queue an edit of the text or, without text, the reply markup of a message."""
+        key = (chat_id, message_id)
+        if key not in self.pending:
+            self.queue.put_nowait(key)
+        self.pending[key] = {"text": text, "reply_markup": reply_markup}
+
+    def cancel(self, chat_id: int, message_id: int) -> None:
+        """Drop the pending edit of a message, if any."""
+        self.pending.pop((chat_id, message_id), None)
+
+    async def send(self, key: tuple[int, int], edit: dict) -> None:
+        chat_id, message_id = key
+        if edit["text"] is not None:
+            await app.edit_message_text(
+                chat_id=chat_id,
+                message_id=message_id,
+                text=edit["text"],
+                reply_markup=edit["reply_markup"],
+            )
+        else:
+            await app.edit_message_reply_markup(
+                chat_id=chat_id,
+                message_id=message_id,
+                reply_markup=edit["reply_markup"],
+            )
+
+    async def worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            key = await self.queue.get()
+            if key not in self.pending:
+                continue
+
+            chat_id = key[0]
+            wait = self.next_edit.get(chat_id, 0) - time.monotonic()
+            if wait > 0:
+                loop.call_later(wait, self.queue.put_nowait, key)
+                continue
+
+            await self.bucket.acquire()
+            edit = self.pending.pop(key, None)
+            if edit is None:
+                continue
+
+            self.next_edit[chat_id] = time.monotonic() + self.chat_delay
+            try:
+                await self.send(key, edit)
+            except errors.FloodWait as fw:
+                metrics.floodwaits.inc(source="editor")
+                logger.warning(f"FloodWait of {fw.value}s while editing in {chat_id}.")
+                self.next_edit[chat_id] = time.monotonic() + fw.value
+                if key not in self.pending:
+                    self.pending[key] = edit
+                    self.queue.put_nowait(key)
+            except (errors.MessageNotModified, errors.MessageIdInvalid):
+                pass
+            except Exception as ex:
+                logger.debug(f"Failed to edit {key}: {ex}")
+
+            if len(self.next_edit) > 10000:
+                now = time.monotonic()
+                self.next_edit = {
+                    chat: ts for chat, ts in self.next_edit.items() if ts > now
+                }
+
+    def boot(self) -> None:
+        for _ in range(self.size):
+            tasks.append(asyncio.create_task(self.worker()))
@@ -6,10 +6,12 @@
 import json
 from functools import wraps
 from pathlib import Path
+from string import Formatter
+from types import MappingProxyType
 
 from pyrogram import errors
 
-from anony import db, logger
+from anony import db, logger, metrics
 
 lang_codes = {
     "ar": "العربية",
@@ -36,24 +38,61 @@ class Language:
     def __init__(self):
         self.lang_codes = lang_codes
         self.lang_dir = Path("anony/locales")
-        self.languages = self.load_files()
-
-    def load_files(self):
-        languages = {}
-        lang_files = {file.stem: file for file in self.lang_dir.glob("*.json")}
-        for lang_code, lang_file in lang_files.items():
+        self.languages = {}
+        self.names = {}
+        self.load_files()
+
+    @staticmethod
+    def fields(text: str) -> set | None:
+        try:
+            return {field for _, field, _, _ in Formatter().parse(text) if field is not None}
+        except ValueError:
+            return None
+
+    def load_files(self) -> int:
+        """
+        Load all language files into read-only mappings.
+
+        Every language is merged over English, so a missing string or one
+        whose placeholders don't match the English string falls back to
+        English instead of failing when it's used. Returns the number of
+        strings that fell back.
+        """
+        files = {}
+        for lang_file in sorted(self.lang_dir.glob("*.json")):
             with open(lang_file, "r", encoding="utf-8") as file:
-                languages[lang_code] = json.load(file)
+                files[lang_file.stem] = json.load(file)
+
+        base = files["en"]
+        fields = {key: self.fields(text) for key, text in base.items()}
+        languages, fallen = {}, 0
+        for lang_code, strings in files.items():
+            merged = dict(base)
+            missing = len(base.keys() - strings.keys())
+            for key, text in strings.items():
+                if key in fields and self.fields(text) != fields[key]:
+                    logger.warning(f"Placeholders of {key} in {lang_code}.json don't match en.json.")
+                    missing += 1
+                    continue
+                merged[key] = text
+            if missing:
+                logger.warning(f"{missing} strings in {lang_code}.json fall back to English.")
+                fallen += missing
+            languages[lang_code] = MappingProxyType(merged)
+
+        self.languages = languages
+        self.names = MappingProxyType(
+            {code: self.lang_codes.get(code, code) for code in languages}
+        )
         logger.info(f"Loaded languages: {', '.join(languages.keys())}")
-        return languages
+        return fallen
 
-    async def get_lang(self, chat_id: int) -> dict:
+    async def get_lang(self, chat_id: int) -> MappingProxyType:
         lang_code = await db.get_lang(chat_id)
-        return self.languages[lang_code]
+        return self.languages.get(lang_code) or self.languages["en"]
 
-    def get_languages(self) -> dict:
-        files = {f.stem for f in self.lang_dir.glob("*.json")}
-        return {code: self.lang_codes[code] for code in sorted(files)}
+    def get_languages(self) -> MappingProxyType:
+        return self.names
 
     def language(self):
         def decorator(func):
@@ -83,11 +122,15 @@ class Language:
                     return await chat.leave()
 
                 lang_code = await db.get_lang(chat.id)
-                lang_dict = self.languages[lang_code]
+                lang_dict = self.languages.get(lang_code) or self.languages["en"]
 
                 setattr(fallen, "lang", lang_dict)
                 try:
-                    return await func(*args, **kwargs)
+                    with metrics.handlers.time(handler=func.__name__):
+                        return await func(*args, **kwargs)
+                except errors.FloodWait:
+                    metrics.floodwaits.inc(source="handlers")
+                    raise
                 except (errors.ChannelPrivate, errors.MessageIdInvalid, errors.MessageNotModified):
                     return
                 except (
@@ -0,0 +1,262 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+import bisect
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+from anony import logger, tasks
+
+LAG_INTERVAL = 0.5
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: tuple = ()):
+        self.name = name
+        self.doc = doc
+        self.labels = labels
+        self.values: dict[tuple, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self.values[tuple(str(labels[name]) for name in self.labels)] += amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(tuple(str(labels[name]) for name in self.labels), 0)
+
+    def samples(self):
+        for values, value in self.values.items():
+            yield self.name, _labels(self.labels, values), value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str, labels: tuple = (), func=None):
+        """
+        A value that goes up and down. With `func`, the value is read when
+        scraped; it returns a number, or a dict of label values to numbers.
+        """
+        super().__init__(name, doc, labels)
+        self.func = func
+
+    def set(self, value: float, **labels) -> None:
+        self.values[tuple(str(labels[name]) for name in self.labels)] = value
+
+    def samples(self):
+        if self.func:
+            result = self.func()
+            if not isinstance(result, dict):
+                result = {(): result}
+            self.values = {
+                (key if isinstance(key, tuple) else (key,)): value
+                for key, value in result.items()
+            }
+        yield from super().samples()
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels: tuple = (), buckets: tuple = BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.labels = labels
+        self.buckets = buckets
+        self.values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        if key not in self.values:
+            # bucket counts, then the sum and the count
+            self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+        data = self.values[key]
+        bucket = bisect.bisect_left(self.buckets, value)
+        if bucket < len(self.buckets):
+            data[bucket] += 1
+        data[-2] += value
+        data[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        data = self.values.get(tuple(str(labels[name]) for name in self.labels))
+        return data[-1] if data else 0
+
+    def quantile(self, q: float, **labels) -> float | None:
+        """Estimate a quantile from the buckets, like Prometheus' histogram_quantile."""
+        data = self.values.get(tuple(str(labels[name]) for name in self.labels))
+        if not data or not data[-1]:
+            return None
+        rank, seen = q * data[-1], 0
+        for i, bound in enumerate(self.buckets):
+            if seen + data[i] >= rank:
+                lower = self.buckets[i - 1] if i else 0
+                return lower + (bound - lower) * (rank - seen) / (data[i] or 1)
+            seen += data[i]
+        return self.buckets[-1]
+
+    def samples(self):
+        for values, data in self.values.items():
+            total = 0
+            for bound, count in zip(self.buckets, data):
+                total += count
+                yield f"{self.name}_bucket", _labels(self.labels, values, f'le="{bound}"'), total
+            yield f"{self.name}_bucket", _labels(self.labels, values, 'le="+Inf"'), data[-1]
+            yield f"{self.name}_sum", _labels(self.labels, values), data[-2]
+            yield f"{self.name}_count", _labels(self.labels, values), data[-1]
+
+
+class Metrics:
+    def __init__(self):
+        """
+        Registry of the bot's metrics, rendered in the Prometheus text
+        format on the /metrics endpoint of the local server.
+        """
+        self.registry: dict[str, Counter | Gauge | Histogram] = {}
+        self.heartbeat = time.monotonic()
+        self.system: dict[str, float] = {}
+        # play counts over the last five minutes of system samples
+        self.play_counts = deque(maxlen=21)
+
+        self.downloads = self.histogram(
+            "anony_download_seconds", "Time taken by media downloads.", ("source",)
+        )
+        self.floodwaits = self.counter(
+            "anony_floodwaits_total", "FloodWait errors received.", ("source",)
+        )
+        self.handlers = self.histogram(
+            "anony_handler_seconds", "Time spent in update handlers.", ("handler",)
+        )
+        self.loop_lag = self.histogram(
+            "anony_loop_lag_seconds", "Delay of event loop wakeups.",
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+        )
+        self.mongo = self.histogram(
+            "anony_mongo_seconds", "Latency of MongoDB commands.", ("command",)
+        )
+        self.plays = self.histogram(
+            "anony_play_seconds", "Time from play_media to audio in the call."
+        )
+        self.searches = self.histogram(
+            "anony_search_seconds", "Latency of YouTube searches."
+        )
+        self.thumbnails = self.histogram(
+            "anony_thumbnail_seconds", "Time taken to generate thumbnails."
+        )
+        self.gauge(
+            "anony_cpu_percent", "CPU usage of the bot process.",
+            func=lambda: self.system.get("cpu", 0),
+        )
+        self.gauge(
+            "anony_rss_bytes", "Resident memory of the bot process.",
+            func=lambda: self.system.get("rss", 0),
+        )
+
+    def register(self, metric):
+        self.registry[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, doc: str, labels: tuple = ()) -> Counter:
+        return self.register(Counter(name, doc, labels))
+
+    def gauge(self, name: str, doc: str, labels: tuple = (), func=None) -> Gauge:
+        return self.register(Gauge(name, doc, labels, func))
+
+    def histogram(self, name: str, doc: str, labels: tuple = (), buckets: tuple = BUCKETS) -> Histogram:
+        return self.register(Histogram(name, doc, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.registry.values():
+            lines.append(f"# HELP {metric.name} {metric.doc}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+    async def monitor_lag(self, interval: float = LAG_INTERVAL) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(interval)
+            self.heartbeat = time.monotonic()
+            self.loop_lag.observe(max(self.heartbeat - start - interval, 0))
+
+    def hit_rate(self, hits: tuple, misses: tuple) -> float | None:
+        """Percentage of downloads served from the given cache sources."""
+        hit = sum(self.downloads.count(source=source) for source in hits)
+        total = hit + sum(self.downloads.count(source=source) for source in misses)
+        return round(hit * 100 / total, 1) if total else None
+
+    def plays_per_minute(self) -> float:
+        if len(self.play_counts) < 2:
+            return 0.0
+        (start, first), (end, last) = self.play_counts[0], self.play_counts[-1]
+        return round((last - first) * 60 / (end - start), 1)
+
+    def sample_system(self, process) -> dict[str, float]:
+        import psutil
+
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage("/")
+        return {
+            "cpu": process.cpu_percent(interval=None),
+            "cores": psutil.cpu_count(logical=False) or psutil.cpu_count(),
+            "host_cpu": psutil.cpu_percent(interval=None),
+            "rss": process.memory_info().rss,
+            "ram_total": memory.total,
+            "ram_percent": memory.percent,
+            "disk_used": disk.used,
+            "disk_total": disk.total,
+            "disk_percent": disk.percent,
+        }
+
+    async def monitor_system(self, interval: int = 15) -> None:
+        """
+        Refresh the system snapshot read by /stats and /ping, so the
+        commands never wait on psutil or the database themselves.
+        """
+        import psutil
+
+        from anony import db
+
+        process = psutil.Process()
+        process.cpu_percent(interval=None)
+        psutil.cpu_percent(interval=None)
+        delay = 1
+        while True:
+            await asyncio.sleep(delay)
+            delay = interval
+            try:
+                system = await asyncio.to_thread(self.sample_system, process)
+                # The cached lists, loading them here would race load_cache.
+                system["chats"] = len(db.chats)
+                system["users"] = len(db.users)
+                self.system = system
+            except Exception as ex:
+                logger.warning(f"Failed to sample the system stats: {ex}")
+            self.play_counts.append((time.monotonic(), self.plays.count()))
+
+    def boot(self) -> None:
+        self.heartbeat = time.monotonic()
+        tasks.append(asyncio.create_task(self.monitor_lag()))
+        tasks.append(asyncio.create_task(self.monitor_system()))
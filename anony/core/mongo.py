@@ -3,12 +3,26 @@
 # This file is part of AnonXMusic
 
 
-from random import randint
+import asyncio
+from random import choice
 from time import time
 
-from pymongo import AsyncMongoClient
+from pymongo import AsyncMongoClient, monitoring
 
-from anony import config, logger, userbot
+from anony import config, logger, metrics, userbot
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Record the latency of every MongoDB command."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        metrics.mongo.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event):
+        metrics.mongo.observe(event.duration_micros / 1e6, command=event.command_name)
 
 
 class MongoDB:
@@ -16,13 +30,19 @@ class MongoDB:
         """
         Initialize the MongoDB connection.
         """
-        self.mongo = AsyncMongoClient(config.MONGO_URL, serverSelectionTimeoutMS=12500)
+        self.mongo = AsyncMongoClient(
+            config.MONGO_URL, serverSelectionTimeoutMS=12500, event_listeners=[CommandTimer()]
+        )
         self.db = self.mongo.Anon
 
         self.admin_list = {}
+        self.admin_expiry = {}
+        self.admin_reloads = {}
+        self.admin_ttl = 3600
         self.active_calls = {}
         self.admin_play = []
         self.blacklisted = []
+        self.broadcastdb = self.db.broadcasts
         self.cmd_delete = []
         self.notified = []
         self.cache = self.db.cache
@@ -78,12 +98,34 @@ class MongoDB:
         return bool(self.active_calls.get(chat_id, 0))
 
     async def get_admins(self, chat_id: int, reload: bool = False) -> list[int]:
+        """
+        Return the cached admins of the chat. The cache is kept up to date
+        from chat member updates and refetched once it's older than
+        `admin_ttl`; concurrent callers share a single refetch.
+        """
         from anony.helpers._admins import reload_admins
 
-        if chat_id not in self.admin_list or reload:
-            self.admin_list[chat_id] = await reload_admins(chat_id)
+        if not reload and self.admin_expiry.get(chat_id, 0) > time():
+            return self.admin_list[chat_id]
+
+        task = self.admin_reloads.get(chat_id)
+        if not task:
+            task = asyncio.create_task(reload_admins(chat_id))
+            task.add_done_callback(lambda _: self.admin_reloads.pop(chat_id, None))
+            self.admin_reloads[chat_id] = task
+        self.admin_list[chat_id] = await asyncio.shield(task)
+        self.admin_expiry[chat_id] = time() + self.admin_ttl
         return self.admin_list[chat_id]
 
+    def update_admin(self, chat_id: int, user_id: int, admin: bool) -> None:
+        admins = self.admin_list.get(chat_id)
+        if admins is None:
+            return
+        if admin and user_id not in admins:
+            admins.append(user_id)
+        elif not admin and user_id in admins:
+            admins.remove(user_id)
+
     # AUTH METHODS
     async def _get_auth(self, chat_id: int) -> set[int]:
         if chat_id not in self.auth:
@@ -111,8 +153,12 @@ class MongoDB:
             )
 
     # ASSISTANT METHODS
-    async def set_assistant(self, chat_id: int) -> int:
-        num = randint(1, len(userbot.clients))
+    async def set_assistant(self, chat_id: int, num: int = 0) -> int:
+        if not num:
+            from anony import anon
+
+            nums = range(1, len(userbot.clients) + 1)
+            num = choice([n for n in nums if n not in anon.unhealthy] or nums)
         await self.assistantdb.update_one(
             {"_id": chat_id},
             {"$set": {"num": num}},
@@ -138,6 +184,16 @@ class MongoDB:
             self.assistant[chat_id]
         )
 
+    # BROADCAST METHODS
+    async def get_broadcast(self) -> dict | None:
+        return await self.broadcastdb.find_one()
+
+    async def save_broadcast(self, job: dict) -> None:
+        await self.broadcastdb.replace_one({"_id": job["_id"]}, job, upsert=True)
+
+    async def rm_broadcast(self, job_id: str) -> None:
+        await self.broadcastdb.delete_one({"_id": job_id})
+
     # BLACKLIST METHODS
     async def add_blacklist(self, chat_id: int) -> None:
         if str(chat_id).startswith("-"):
@@ -184,6 +240,11 @@ class MongoDB:
             self.chats.remove(chat_id)
             await self.chatsdb.delete_one({"_id": chat_id})
 
+    async def rm_chats(self, chat_ids: list[int]) -> None:
+        removed = set(chat_ids)
+        self.chats[:] = [chat_id for chat_id in self.chats if chat_id not in removed]
+        await self.chatsdb.delete_many({"_id": {"$in": list(removed)}})
+
     async def get_chats(self) -> list:
         if not self.chats:
             self.chats.extend([chat["_id"] async for chat in self.chatsdb.find()])
@@ -289,6 +350,11 @@ class MongoDB:
             self.users.remove(user_id)
             await self.usersdb.delete_one({"_id": user_id})
 
+    async def rm_users(self, user_ids: list[int]) -> None:
+        removed = set(user_ids)
+        self.users[:] = [user_id for user_id in self.users if user_id not in removed]
+        await self.usersdb.delete_many({"_id": {"$in": list(removed)}})
+
     async def get_users(self) -> list:
         if not self.users:
             self.users.extend([user["_id"] async for user in self.usersdb.find()])
@@ -0,0 +1,67 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class Profiler:
+    def __init__(self, interval: float = 0.005):
+        """
+        Sampling profiler for the running bot.
+
+        A thread records the stacks of all the other threads every `interval`
+        seconds, so the event loop keeps running while it's profiled. The
+        stacks are counted in the collapsed format that flamegraph tools read.
+        """
+        self.interval = interval
+        self.lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.lock.locked()
+
+    def frame_name(self, frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def sample(self, seconds: float) -> tuple[Counter, int]:
+        stacks = Counter()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        me = threading.get_ident()
+        samples = 0
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame:
+                    stack.append(self.frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                stacks[";".join(reversed(stack))] += 1
+            samples += 1
+            time.sleep(self.interval)
+        return stacks, samples
+
+    async def profile(self, seconds: float) -> tuple[Counter, int]:
+        """Sample for `seconds` and return the collapsed stacks and the sample count."""
+        async with self.lock:
+            return await asyncio.to_thread(self.sample, seconds)
+
+    def collapse(self, stacks: Counter) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+
+    def top(self, stacks: Counter, count: int = 15) -> list[tuple[str, int]]:
+        """The functions that the most samples were taken in."""
+        leaves = Counter()
+        for stack, samples in stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += samples
+        return leaves.most_common(count)
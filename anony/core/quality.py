@@ -0,0 +1,79 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+
+from pytgcalls.types import AudioQuality, VideoQuality
+
+from anony import config, db, logger
+
+PROFILES = {
+    "high": (AudioQuality.HIGH, VideoQuality.HD_720p),
+    "medium": (AudioQuality.MEDIUM, VideoQuality.SD_480p),
+    "low": (AudioQuality.LOW, VideoQuality.SD_360p),
+}
+LEVELS = list(PROFILES)
+
+
+class Quality:
+    def __init__(self):
+        """
+        Picks the stream quality profile of new streams from the host load.
+
+        The host level steps down one profile at a time while the load is
+        over MAX_CPU_LOAD, and back up only after the load has stayed well
+        under it for a while, so calls don't flap between profiles. Running
+        streams keep their profile until the next track or seek.
+        """
+        self.fixed = config.QUALITY if config.QUALITY in PROFILES else None
+        self.level = 0
+        self.cpu = 0.0
+        self.calm = 0
+        self.hot = 0
+
+    def load(self) -> float:
+        """Host load in percent, from CPU usage and the active call count."""
+        load = self.cpu
+        if config.MAX_CALLS:
+            load = max(load, len(db.active_calls) * 100 / config.MAX_CALLS)
+        return round(load, 1)
+
+    def profile(self, assistant_load: int = 0) -> str:
+        if self.fixed:
+            return self.fixed
+        level = self.level
+        if config.MAX_ASSISTANT_LOAD and assistant_load >= config.MAX_ASSISTANT_LOAD:
+            level += 1
+        return LEVELS[min(level, len(LEVELS) - 1)]
+
+    def get(self, assistant_load: int = 0) -> tuple[AudioQuality, VideoQuality]:
+        return PROFILES[self.profile(assistant_load)]
+
+    def sample(self) -> None:
+        import psutil
+
+        self.cpu = self.cpu * 0.7 + psutil.cpu_percent(interval=None) * 0.3
+        load = self.load()
+
+        if load > config.MAX_CPU_LOAD:
+            self.calm, self.hot = 0, self.hot + 1
+            if self.hot >= 2 and self.level < len(LEVELS) - 1:
+                self.level, self.hot = self.level + 1, 0
+                logger.info(f"Host load at {load}%, streaming in {LEVELS[self.level]} quality.")
+        elif load < config.MAX_CPU_LOAD - 20:
+            self.calm, self.hot = self.calm + 1, 0
+            if self.calm >= 12 and self.level:
+                self.level, self.calm = self.level - 1, 0
+                logger.info(f"Host load at {load}%, streaming in {LEVELS[self.level]} quality.")
+        else:
+            self.calm = self.hot = 0
+
+    async def monitor(self, sleep: int = 5) -> None:
+        import psutil
+
+        psutil.cpu_percent(interval=None)
+        while True:
+            await asyncio.sleep(sleep)
+            self.sample()
@@ -0,0 +1,124 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import os
+import re
+
+from aiohttp import web
+from pyrogram import types
+
+from anony import config, logger, metrics
+
+
+class Server:
+    def __init__(self):
+        """
+        Local HTTP server for the bot.
+
+        Telegram files registered here are served with Range support from
+        their background download as it's written, so ffmpeg can start playing
+        them before the whole file is downloaded, without holding one of the
+        bot's download slots for the length of the track. The bot's metrics
+        are served on /metrics.
+        """
+        self.files: dict[str, tuple[types.Message, int, str]] = {}
+        self.web = web.Application()
+        self.web.router.add_get("/tg/{file_id}", self.serve_file)
+        self.web.router.add_get("/metrics", self.serve_metrics)
+        self.runner = None
+        self.port = config.SERVER_PORT
+        # ffmpeg connects to the configured host, through loopback when
+        # the server listens on every interface.
+        host = config.SERVER_HOST
+        host = "127.0.0.1" if host in ("", "0.0.0.0") else "::1" if host == "::" else host
+        self.host = f"[{host}]" if ":" in host else host
+
+    def register(self, file_id: str, msg: types.Message, size: int, file_path: str) -> str:
+        """Expose the media of the message and return its local URL."""
+        self.files[file_id] = (msg, size, file_path)
+        return f"http://{self.host}:{self.port}/tg/{file_id}"
+
+    def release(self, *items) -> None:
+        """Drop the files of tracks that ended, unless a queue still has them."""
+        from anony import queue
+
+        in_use = queue.in_use()
+        for item in items:
+            if item and item.id not in in_use:
+                self.files.pop(item.id, None)
+
+    def parse_range(self, header: str, size: int) -> tuple[int, int] | None:
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", header.strip())
+        if not match or not any(match.groups()):
+            return None
+        start, end = match.groups()
+        if not start:
+            start, end = max(size - int(end), 0), size - 1
+        else:
+            start, end = int(start), min(int(end or size - 1), size - 1)
+        return (start, end) if start <= end else None
+
+    async def serve_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=metrics.render(), content_type="text/plain")
+
+    async def serve_file(self, request: web.Request) -> web.StreamResponse:
+        file = self.files.get(request.match_info["file_id"])
+        if not file:
+            raise web.HTTPNotFound()
+
+        msg, size, file_path = file
+        if os.path.exists(file_path):
+            return web.FileResponse(file_path)
+
+        from anony import tg
+
+        file_id = request.match_info["file_id"]
+        if file_id not in tg.partial:
+            # The download failed before, try it again.
+            tg.start(msg, file_id, file_path, size, stream=True)
+
+        start, end = 0, size - 1
+        if "Range" in request.headers:
+            # Malformed headers fail to parse here and get a 416 as well.
+            byte_range = self.parse_range(request.headers.get("Range", ""), size)
+            if not byte_range:
+                raise web.HTTPRequestRangeNotSatisfiable(
+                    headers={"Content-Range": f"bytes */{size}"}
+                )
+            start, end = byte_range
+
+        response = web.StreamResponse(
+            status=206 if (start, end) != (0, size - 1) else 200,
+            headers={
+                "Accept-Ranges": "bytes",
+                "Content-Length": str(end - start + 1),
+                "Content-Type": "application/octet-stream",
+            },
+        )
+        if response.status == 206:
+            response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        await response.prepare(request)
+        if request.method == "HEAD":
+            return response
+
+        try:
+            async for chunk in tg.read(file_id, file_path, start, end):
+                await response.write(chunk)
+        except ConnectionResetError:
+            pass
+        return response
+
+    async def boot(self) -> None:
+        self.runner = web.AppRunner(self.web, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, config.SERVER_HOST, config.SERVER_PORT)
+        await site.start()
+        self.port = self.runner.addresses[0][1]
+        logger.info(f"Local server started on port {self.port}.")
+
+    async def exit(self) -> None:
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
@@ -0,0 +1,96 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+import json
+import os
+import time
+
+from anony import config, logger
+from anony.helpers import utils
+
+STORE_DIR = "storage/telegram"
+
+
+class MediaStore:
+    def __init__(self):
+        """
+        Cache of media downloaded from Telegram.
+
+        Files live in their own directory with a persistent index, so they
+        survive restarts and aren't touched by the YouTube download cleanup.
+        Once the store grows over TG_STORE_QUOTA, the least recently played
+        files that no queue points at are evicted.
+        """
+        self.index_path = os.path.join(STORE_DIR, "index.json")
+        self.index: dict[str, dict] = {}
+        self.quota = config.TG_STORE_QUOTA
+        self.pending: asyncio.TimerHandle | None = None
+
+    def load(self) -> None:
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        self.index = {
+            file_id: entry
+            for file_id, entry in index.items()
+            if os.path.exists(os.path.join(STORE_DIR, entry["name"]))
+        }
+        logger.info(f"Loaded {len(self.index)} stored Telegram file(s).")
+
+    def save(self) -> None:
+        if self.pending:
+            self.pending.cancel()
+            self.pending = None
+        temp = f"{self.index_path}.tmp"
+        with open(temp, "w") as f:
+            json.dump(self.index, f)
+        os.replace(temp, self.index_path)
+
+    def path(self, file_id: str, ext: str) -> str:
+        return os.path.abspath(os.path.join(STORE_DIR, f"{file_id}.{ext}"))
+
+    def get(self, file_id: str) -> str | None:
+        """Return the stored file path, marking it as recently used."""
+        entry = self.index.get(file_id)
+        if not entry:
+            return None
+        path = os.path.abspath(os.path.join(STORE_DIR, entry["name"]))
+        if not os.path.exists(path):
+            self.index.pop(file_id)
+            return None
+        entry["used"] = time.time()
+        self.save_later()
+        return path
+
+    def save_later(self, delay: int = 30) -> None:
+        """Batch the index writes of cache hits into one every `delay` seconds."""
+        if not self.pending:
+            self.pending = asyncio.get_running_loop().call_later(delay, self.save)
+
+    def exit(self) -> None:
+        if self.pending:
+            self.save()
+
+    def add(self, file_id: str, path: str) -> None:
+        self.index[file_id] = {
+            "name": os.path.basename(path),
+            "size": os.path.getsize(path),
+            "used": time.time(),
+        }
+        self.evict()
+        self.save()
+
+    def evict(self) -> None:
+        from anony import queue
+
+        files = [
+            (file_id, os.path.join(STORE_DIR, entry["name"]), entry["size"], entry["used"])
+            for file_id, entry in self.index.items()
+        ]
+        for file_id in utils.evict(files, self.quota, queue.in_use()):
+            self.index.pop(file_id)
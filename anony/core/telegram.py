@@ -4,22 +4,29 @@
 
 
 import asyncio
+import math
 import os
 import time
 
 from pyrogram import types
 
-from anony import config
+from anony import app, config, editor, logger, metrics, server, store
 from anony.helpers import Media, buttons, utils
 
 
 class Telegram:
     def __init__(self):
-        self.active = []
+        self.downloads = {}
+        self.listeners = {}
         self.events = {}
         self.last_edit = {}
         self.active_tasks = {}
+        # file_id -> progress of the ranges of a download that is streamed
+        # while it runs, see read().
+        self.partial = {}
         self.sleep = 5
+        self.parts = 4
+        self.chunk_size = 1024 * 1024
 
     def get_media(self, msg: types.Message) -> bool:
         return any([msg.video, msg.audio, msg.document, msg.voice])
@@ -33,12 +40,163 @@ class Telegram:
         if task and not task.done():
             task.cancel()
         if event or task:
+            editor.cancel(query.message.chat.id, query.message.id)
             await query.edit_message_text(
                 query.lang["dl_cancel"].format(query.from_user.mention)
             )
         else:
             await query.answer(query.lang["dl_not_found"], show_alert=True)
 
+    def report(self, file_id: str, current: int, total: int) -> None:
+        for progress in list(self.listeners.get(file_id, {}).values()):
+            progress(current, total)
+
+    def start(
+        self, msg: types.Message, file_id: str, file_path: str, file_size: int, stream: bool = False
+    ) -> asyncio.Task:
+        """
+        Return the running download of the file, starting one if needed.
+        Downloads started with `stream` can be read with read() while they run.
+        """
+        task = self.downloads.get(file_id)
+        if task:
+            return task
+
+        started = time.monotonic()
+        state = None
+        if stream:
+            state = {
+                "cond": asyncio.Condition(),
+                "ranges": [],
+                "done": False,
+                "path": f"{file_path}.part",
+            }
+            self.partial[file_id] = state
+
+        def done(task: asyncio.Task) -> None:
+            if self.downloads.get(file_id) is task:
+                self.downloads.pop(file_id)
+            if state and self.partial.get(file_id) is state:
+                self.partial.pop(file_id)
+            if task.cancelled():
+                return
+            if task.exception():
+                logger.warning(f"Failed to download {file_id}: {task.exception()}")
+            else:
+                metrics.downloads.observe(time.monotonic() - started, source="telegram")
+                store.add(file_id, file_path)
+
+        task = asyncio.create_task(self.fetch(msg, file_id, file_path, file_size, state))
+        task.add_done_callback(done)
+        self.downloads[file_id] = task
+        return task
+
+    async def fetch(
+        self, msg: types.Message, file_id: str, file_path: str, file_size: int, state: dict | None = None
+    ) -> None:
+        """
+        Download the file of the message into `file_path`.
+
+        Bigger files are split into chunk ranges that are requested in
+        parallel and written at their offsets, so one slow range doesn't
+        hold up the rest. The progress of every range is kept in `state`,
+        when given, for read().
+        """
+        chunks = math.ceil(file_size / self.chunk_size)
+        parts = min(self.parts, chunks // 8)
+        if parts < 2 and not state:
+            # A coroutine, so pyrogram runs it on the loop and not in an executor.
+            async def progress(current: int, total: int) -> None:
+                self.report(file_id, current, total)
+
+            await msg.download(file_name=file_path, progress=progress)
+            return
+
+        temp = f"{file_path}.part"
+        done = 0
+        fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        step = math.ceil(chunks / max(parts, 1))
+        # [start, written up to, end] in bytes, for every range.
+        progress = []
+        for start in range(0, chunks, step):
+            offset = start * self.chunk_size
+            progress.append([offset, offset, min(offset + step * self.chunk_size, file_size)])
+        if state:
+            state["ranges"] = progress
+
+        async def fetch_range(index: int, start: int, limit: int) -> None:
+            nonlocal done
+            async for chunk in app.stream_media(msg, limit=limit, offset=start):
+                os.pwrite(fd, chunk, progress[index][1])
+                progress[index][1] += len(chunk)
+                done += len(chunk)
+                self.report(file_id, done, file_size)
+                if state:
+                    async with state["cond"]:
+                        state["cond"].notify_all()
+
+        ranges = [
+            asyncio.create_task(fetch_range(index, start, min(step, chunks - start)))
+            for index, start in enumerate(range(0, chunks, step))
+        ]
+        try:
+            await asyncio.gather(*ranges)
+            os.close(fd)
+            fd = None
+            os.replace(temp, file_path)
+        finally:
+            for task in ranges:
+                task.cancel()
+            if fd is not None:
+                os.close(fd)
+            if os.path.exists(temp):
+                os.remove(temp)
+            if state:
+                state["done"] = True
+                async with state["cond"]:
+                    state["cond"].notify_all()
+
+    def written(self, state: dict, position: int) -> int:
+        """Where the written bytes from `position` on end, `position` if it isn't written yet."""
+        for start, written, end in state["ranges"]:
+            if start <= position < end:
+                return max(written, position)
+        return position
+
+    async def read(self, file_id: str, file_path: str, start: int, end: int):
+        """
+        Yield bytes `start` to `end` of a streamed download, each part as
+        soon as the download has written it. Stops early if the download
+        fails.
+        """
+        state = self.partial.get(file_id)
+        if not state:
+            return
+        fd, position = None, start
+        try:
+            while position <= end:
+                async with state["cond"]:
+                    await state["cond"].wait_for(
+                        lambda: state["done"] or self.written(state, position) > position
+                    )
+                until = min(self.written(state, position), end + 1)
+                if until <= position:
+                    return
+                if fd is None:
+                    try:
+                        fd = os.open(state["path"], os.O_RDONLY)
+                    except FileNotFoundError:
+                        # Finished and renamed in the meantime.
+                        fd = os.open(file_path, os.O_RDONLY)
+                chunk = os.pread(fd, min(until - position, self.chunk_size), position)
+                if not chunk:
+                    return
+                position += len(chunk)
+                yield chunk
+        finally:
+            if fd is not None:
+                os.close(fd)
+
     async def download(self, msg: types.Message, sent: types.Message) -> Media | None:
         msg_id = sent.id
         event = asyncio.Event()
@@ -62,7 +220,7 @@ class Telegram:
             await sent.edit_text(sent.lang["dl_limit"])
             return await sent.stop_propagation()
 
-        async def progress(current, total):
+        def progress(current, total):
             if event.is_set():
                 return
 
@@ -82,25 +240,35 @@ class Telegram:
                 eta,
             )
 
-            await sent.edit_text(
-                text, reply_markup=buttons.cancel_dl(sent.lang["cancel"])
+            editor.edit(
+                sent.chat.id,
+                sent.id,
+                text,
+                reply_markup=buttons.cancel_dl(sent.lang["cancel"]),
             )
 
         try:
-            file_path = f"downloads/{file_id}.{file_ext}"
-            if not os.path.exists(file_path):
-                if file_id in self.active:
-                    await sent.edit_text(sent.lang["dl_active"])
-                    return await sent.stop_propagation()
-
-                self.active.append(file_id)
-                task = asyncio.create_task(
-                    msg.download(file_name=file_path, progress=progress)
-                )
-                self.active_tasks[msg_id] = task
-                await task
-                if file_id in self.active: self.active.remove(file_id)
+            file_path = store.get(file_id)
+            if file_path:
+                metrics.downloads.observe(0, source="store")
+            file_path = file_path or store.path(file_id, file_ext)
+            stream = config.TG_STREAM_SIZE and file_size >= config.TG_STREAM_SIZE
+            if not os.path.exists(file_path) and stream:
+                # Big files are played over the local server while the
+                # download keeps going in the background for later plays.
+                self.start(msg, file_id, file_path, file_size, stream=True)
+                file_path = server.register(file_id, msg, file_size, file_path)
+
+            elif not os.path.exists(file_path):
+                # Requesters of the same file wait on one shared download.
+                task = self.start(msg, file_id, file_path, file_size)
+                self.listeners.setdefault(file_id, {})[msg_id] = progress
+
+                waiter = asyncio.ensure_future(asyncio.shield(task))
+                self.active_tasks[msg_id] = waiter
+                await waiter
                 self.active_tasks.pop(msg_id, None)
+                editor.cancel(sent.chat.id, msg_id)
                 await sent.edit_text(
                     sent.lang["dl_complete"].format(round(time.time() - start_time, 2))
                 )
@@ -118,9 +286,19 @@ class Telegram:
         except asyncio.CancelledError:
             return await sent.stop_propagation()
         finally:
+            editor.cancel(sent.chat.id, msg_id)
             self.events.pop(msg_id, None)
             self.last_edit.pop(msg_id, None)
-            if file_id in self.active: self.active.remove(file_id)
+            self.active_tasks.pop(msg_id, None)
+            listeners = self.listeners.get(file_id)
+            if listeners is not None:
+                listeners.pop(msg_id, None)
+                if not listeners:
+                    # Nobody is waiting anymore, drop the shared download.
+                    self.listeners.pop(file_id, None)
+                    task = self.downloads.get(file_id)
+                    if task and not task.done():
+                        task.cancel()
 
 
     async def process_m3u8(self, url: str, msg_id: int, video: bool) -> Media:
@@ -0,0 +1,107 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+import os
+
+from ntgcalls import MediaSource
+from pytgcalls.types.raw import AudioParameters, AudioStream, Stream
+
+from anony import config, logger, queue
+from anony.helpers import Media, Track, utils
+
+PCM_DIR = "cache/pcm"
+SAMPLE_RATE = 48000
+CHANNELS = 2
+
+
+class Transcoder:
+    def __init__(self, jobs: int = 2):
+        """
+        Background transcoder for downloaded audio.
+
+        Tracks are decoded once into raw 48k stereo s16le PCM, which ntgcalls
+        reads straight from the file, so repeated plays of the same track
+        don't run ffmpeg at all. PCM takes about 11 MB a minute, so once the
+        cache grows over TRANSCODE_QUOTA, the least recently played files
+        that no queue points at are evicted.
+        """
+        self.enabled = config.TRANSCODE_CACHE
+        self.quota = config.TRANSCODE_QUOTA
+        self.running: dict[str, asyncio.Task] = {}
+        self.sem = asyncio.Semaphore(jobs)
+
+    def path(self, media: Media | Track) -> str:
+        return os.path.join(PCM_DIR, f"{media.id}.pcm")
+
+    def eligible(self, media: Media | Track) -> bool:
+        return (
+            self.enabled
+            and not media.video
+            and bool(media.file_path)
+            and not str(media.file_path).startswith("http")
+            and os.path.exists(media.file_path)
+        )
+
+    def get_stream(self, media: Media | Track) -> Stream | None:
+        """Return a stream reading the transcoded file, if there is one."""
+        if not self.eligible(media):
+            return None
+        path = self.path(media)
+        if not os.path.exists(path):
+            return None
+        # The modification time marks the file as recently used for eviction.
+        os.utime(path)
+        return Stream(
+            microphone=AudioStream(
+                MediaSource.FILE,
+                path,
+                AudioParameters(SAMPLE_RATE, CHANNELS),
+            )
+        )
+
+    def schedule(self, media: Media | Track) -> None:
+        """Start transcoding the media in the background, if it's not done yet."""
+        if not self.eligible(media):
+            return
+        path = self.path(media)
+        if path in self.running or os.path.exists(path):
+            return
+        self.running[path] = asyncio.create_task(self.transcode(media.file_path, path))
+
+    async def transcode(self, source: str, path: str) -> None:
+        temp = f"{path}.part"
+        try:
+            async with self.sem:
+                os.makedirs(PCM_DIR, exist_ok=True)
+                proc = await asyncio.create_subprocess_exec(
+                    "ffmpeg", "-y", "-nostdin", "-loglevel", "error",
+                    "-i", source, "-vn",
+                    "-f", "s16le", "-ac", str(CHANNELS), "-ar", str(SAMPLE_RATE),
+                    temp,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                _, stderr = await proc.communicate()
+            if proc.returncode != 0:
+                raise RuntimeError(stderr.decode(errors="ignore").strip())
+            os.replace(temp, path)
+            self.evict()
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            logger.warning(f"Failed to transcode {source}: {ex}")
+        finally:
+            self.running.pop(path, None)
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    def evict(self) -> None:
+        files = []
+        for entry in os.scandir(PCM_DIR):
+            if entry.name.endswith(".pcm"):
+                stat = entry.stat()
+                files.append((entry.name[:-4], entry.path, stat.st_size, stat.st_mtime))
+        utils.evict(files, self.quota, queue.in_use())
@@ -3,6 +3,8 @@
 # This file is part of AnonXMusic
 
 
+import asyncio
+
 from pyrogram import Client
 
 from anony import config, logger
@@ -32,7 +34,7 @@ class Userbot(Client):
                 ),
             )
 
-    async def boot_client(self, num: int, ub: Client):
+    async def boot_client(self, num: int, ub: Client) -> Client:
         """
         Boot a client and perform initial setup.
         Args:
@@ -57,23 +59,29 @@ class Userbot(Client):
         client.name = ub.me.first_name
         client.username = ub.me.username
         client.mention = ub.me.mention
-        self.clients.append(client)
         try:
             await ub.join_chat("FakeAaru")
         except Exception:
             pass
         logger.info(f"Assistant {num} started as @{client.username}")
+        return client
 
     async def boot(self):
         """
-        Asynchronously starts the assistants.
+        Asynchronously starts the assistants, all at once. They are kept
+        in session order regardless of which one is up first.
         """
-        if config.SESSION1:
-            await self.boot_client(1, self.one)
-        if config.SESSION2:
-            await self.boot_client(2, self.two)
-        if config.SESSION3:
-            await self.boot_client(3, self.three)
+        sessions = [config.SESSION1, config.SESSION2, config.SESSION3]
+        clients = [self.one, self.two, self.three]
+        self.clients.extend(
+            await asyncio.gather(
+                *(
+                    self.boot_client(num, client)
+                    for num, (session, client) in enumerate(zip(sessions, clients), 1)
+                    if session
+                )
+            )
+        )
 
     async def exit(self):
         """
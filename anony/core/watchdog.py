@@ -0,0 +1,86 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+import html
+import sys
+import threading
+import time
+import traceback
+
+from anony import app, config, lang, logger, metrics
+from anony.core.metrics import LAG_INTERVAL
+
+
+class Watchdog:
+    def __init__(self, cooldown: int = 300):
+        """
+        Event loop watchdog.
+
+        A thread checks the heartbeat of the loop lag monitor. When it goes
+        stale for over BLOCK_THRESHOLD seconds, the stack of the loop thread
+        is captured, which points at the callback that is holding the loop.
+        Once the loop is free again the block is logged and reported to the
+        logger group, at most once every `cooldown` seconds.
+        """
+        self.threshold = config.BLOCK_THRESHOLD
+        self.cooldown = cooldown
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.loop_thread: int | None = None
+        self.stopped = threading.Event()
+        self.last_report = 0.0
+        self.blocked = metrics.counter(
+            "anony_loop_blocked_total", "Times the event loop was blocked over the threshold."
+        )
+
+    def stale(self) -> float:
+        """Seconds the loop heartbeat is overdue by."""
+        return time.monotonic() - metrics.heartbeat - LAG_INTERVAL
+
+    def capture(self) -> str:
+        frame = sys._current_frames().get(self.loop_thread)
+        if not frame:
+            return ""
+        return "".join(traceback.format_stack(frame))
+
+    def watch(self) -> None:
+        stack, longest = None, 0.0
+        while not self.stopped.wait(0.1):
+            stale = self.stale()
+            if stale >= self.threshold:
+                if stack is None:
+                    stack = self.capture()
+                longest = max(longest, stale)
+                continue
+            if stack is None:
+                continue
+
+            self.blocked.inc()
+            logger.warning(f"Event loop was blocked for {longest:.2f}s at:\n{stack}")
+            if time.monotonic() - self.last_report > self.cooldown:
+                self.last_report = time.monotonic()
+                asyncio.run_coroutine_threadsafe(self.report(longest, stack), self.loop)
+            stack, longest = None, 0.0
+
+    async def report(self, duration: float, stack: str) -> None:
+        _lang = await lang.get_lang(app.logger)
+        try:
+            await app.send_message(
+                app.logger,
+                _lang["loop_blocked"].format(f"{duration:.2f}", html.escape(stack[-3500:])),
+            )
+        except Exception as ex:
+            logger.warning(f"Failed to report the blocked loop: {ex}")
+
+    def boot(self) -> None:
+        """Start watching the running loop, when a threshold is set."""
+        if not self.threshold:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        threading.Thread(target=self.watch, name="watchdog", daemon=True).start()
+
+    def exit(self) -> None:
+        self.stopped.set()
@@ -0,0 +1,64 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from anony import config, logger
+
+
+class Workers:
+    def __init__(self):
+        """
+        Pool of worker processes for CPU-bound work.
+
+        Thumbnail rendering and yt-dlp extraction hold the GIL for long
+        stretches, so they are run here instead of on the event loop. Every
+        worker is a fork of the whole bot, so the pool is kept small.
+        """
+        self.size = config.WORKERS
+        self.pool = None
+
+    def boot(self) -> None:
+        """
+        Start the worker processes.
+
+        Must run before the event loop starts, so the processes are forked
+        while the bot is still single threaded. Forking a running loop and
+        its threads is unsafe, and newer Python versions warn about it.
+        """
+        if threading.active_count() > 1:
+            return logger.warning("Threads are already running, CPU-bound work stays in threads.")
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=multiprocessing.get_context("fork"),
+        )
+        for _ in range(self.size):
+            self.pool.submit(int)
+        logger.info(f"Started {self.size} worker process(es).")
+
+    async def run(self, func, *args):
+        """Run a picklable function in a worker process and return its result."""
+        if not self.pool:
+            return await asyncio.to_thread(func, *args)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+        except BrokenProcessPool:
+            # A worker died, e.g. killed for memory, which breaks the pool.
+            # It can't be forked again from the running loop, so later work
+            # runs in threads. This call isn't retried, it may be the cause.
+            if self.pool:
+                logger.error("A worker process died, CPU-bound work now runs in threads.")
+                self.exit()
+            raise
+
+    def exit(self) -> None:
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        logger.info("Worker processes stopped.")
@@ -2,15 +2,43 @@
 # Licensed under the MIT License.
 # This file is part of AnonXMusic
 
+import asyncio
 import os
 import re
-import asyncio
+import time
 import aiohttp
-import yt_dlp
-from py_yt import Playlist, VideosSearch
-from anony import logger
+from anony import logger, metrics, workers
 from anony.helpers import Track, utils
 
+
+def _fallback_download(url: str, file_path: str, video: bool) -> str | None:
+    """Download with yt-dlp in a worker process, returning the error if any."""
+    import yt_dlp
+
+    ydl_opts = {
+        "format": "bestaudio/best" if not video else "best[height<=?720]",
+        "outtmpl": file_path,
+        "quiet": True,
+        "geo_bypass": True,
+        "nocheckcertificate": True,
+        # iPhone aur Smart TV ka bypass
+        "extractor_args": {"youtube": ["client=IOS,TV", "player_client=IOS,TV"]},
+        "http_headers": {
+            "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1"
+        }
+    }
+
+    # 🔥 Cookie Injector 🔥 (Agar file bahar rakhi hai toh use karega)
+    if os.path.exists("cookies.txt"):
+        ydl_opts["cookiefile"] = "cookies.txt"
+
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl.download([url])
+        return None
+    except Exception as e:
+        return str(e) or type(e).__name__
+
 class YouTube:
     def __init__(self):
         self.base = "https://www.youtube.com/watch?v="
@@ -20,6 +48,7 @@ class YouTube:
             r"([A-Za-z0-9_-]{11}|PL[A-Za-z0-9_-]+)([&?][^\s]*)?"
         )
         self.api_url = "https://shrutibots.site"
+        self.downloads: dict[str, asyncio.Task] = {}
 
     async def save_cookies(self, urls: list[str]) -> None:
         pass
@@ -28,8 +57,11 @@ class YouTube:
         return bool(re.match(self.regex, url))
 
     async def search(self, query: str, m_id: int, video: bool = False) -> Track | None:
+        from py_yt import VideosSearch
+
         _search = VideosSearch(query, limit=1, with_live=False)
-        results = await _search.next()
+        with metrics.searches.time():
+            results = await _search.next()
         if results and results["result"]:
             data = results["result"][0]
             return Track(
@@ -47,6 +79,8 @@ class YouTube:
         return None
 
     async def playlist(self, limit: int, user: str, url: str, video: bool) -> list[Track | None]:
+        from py_yt import Playlist
+
         tracks = []
         try:
             plist = await Playlist.get(url)
@@ -71,7 +105,8 @@ class YouTube:
     async def clear_old_files(self, directory: str, keep_limit: int = 10):
         # 🔥 AWS Storage Saver 🔥
         try:
-            files = [os.path.join(directory, f) for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f))]
+            # .part files are downloads still running.
+            files = [os.path.join(directory, f) for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f)) and not f.endswith(".part")]
             if len(files) > keep_limit:
                 files.sort(key=os.path.getctime)
                 files_to_delete = len(files) - keep_limit
@@ -85,6 +120,25 @@ class YouTube:
             logger.error(f"Auto-Clean Error: {e}")
 
     async def download(self, video_id: str, video: bool = False) -> str | None:
+        """
+        Download the media and return its path. Concurrent requests for the
+        same file, like a preload and a skip, share one download, and a
+        cancelled caller doesn't cancel it for the others.
+        """
+        key = f"{video_id}:{video}"
+        task = self.downloads.get(key)
+        if not task:
+            task = asyncio.create_task(self.fetch(video_id, video))
+            self.downloads[key] = task
+
+            def done(task: asyncio.Task) -> None:
+                if self.downloads.get(key) is task:
+                    self.downloads.pop(key)
+
+            task.add_done_callback(done)
+        return await asyncio.shield(task)
+
+    async def fetch(self, video_id: str, video: bool = False) -> str | None:
         DOWNLOAD_DIR = "downloads"
         os.makedirs(DOWNLOAD_DIR, exist_ok=True)
         
@@ -95,11 +149,16 @@ class YouTube:
         file_path = os.path.join(DOWNLOAD_DIR, f"{video_id}.{ext}")
 
         if os.path.exists(file_path) and os.path.getsize(file_path) > 100000:
+            metrics.downloads.observe(0, source="cache")
             return file_path
 
         # PLAN A: ShrutiBots API (Fastest)
         logger.info(f"Fast Downloading {video_id} via ShrutiBots API...")
         api_success = False
+        start = time.perf_counter()
+        # Written under another name and renamed once complete, so a cut
+        # off download never passes for a cached file.
+        temp = f"{file_path}.part"
         try:
             async with aiohttp.ClientSession() as session:
                 params = {"url": video_id, "type": "video" if video else "audio"}
@@ -111,47 +170,30 @@ class YouTube:
                             stream_url = f"{self.api_url}/stream/{video_id}?type={'video' if video else 'audio'}"
                             async with session.get(stream_url, headers={"X-Download-Token": token}, timeout=120) as file_response:
                                 if file_response.status == 200:
-                                    with open(file_path, "wb") as f:
+                                    with open(temp, "wb") as f:
                                         async for chunk in file_response.content.iter_chunked(16384):
                                             f.write(chunk)
+                                    os.replace(temp, file_path)
                                     api_success = True
         except Exception as e:
             logger.warning(f"ShrutiBots API Down/Failed: {e}")
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
         
         if api_success and os.path.exists(file_path) and os.path.getsize(file_path) > 100000:
+            metrics.downloads.observe(time.perf_counter() - start, source="api")
             return file_path
 
         # PLAN B: Ultra-Bypass yt-dlp Fallback (No bot detection!)
         logger.info(f"API failed. Using Fallback yt-dlp to download {video_id}...")
         
-        def _fallback_download():
-            ydl_opts = {
-                "format": "bestaudio/best" if not video else "best[height<=?720]",
-                "outtmpl": file_path,
-                "quiet": True,
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                # iPhone aur Smart TV ka bypass
-                "extractor_args": {"youtube": ["client=IOS,TV", "player_client=IOS,TV"]},
-                "http_headers": {
-                    "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1"
-                }
-            }
-            
-            # 🔥 Cookie Injector 🔥 (Agar file bahar rakhi hai toh use karega)
-            if os.path.exists("cookies.txt"):
-                ydl_opts["cookiefile"] = "cookies.txt"
-
-            try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([self.base + video_id])
-                return True
-            except Exception as e:
-                logger.error(f"Fallback DL Error: {e}")
-                return False
-
-        success = await asyncio.to_thread(_fallback_download)
-        if success and os.path.exists(file_path):
+        start = time.perf_counter()
+        error = await workers.run(_fallback_download, self.base + video_id, file_path, video)
+        if error:
+            logger.error(f"Fallback DL Error: {error}")
+        elif os.path.exists(file_path):
+            metrics.downloads.observe(time.perf_counter() - start, source="ytdlp")
             return file_path
 
         return None
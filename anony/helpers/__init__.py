@@ -4,10 +4,12 @@
 
 
 from ._admins import admin_check, can_manage_vc, is_admin, reload_admins
+from ._clock import Clock
 from ._dataclass import Media, Track
 from ._exec import format_exception, meval
 from ._inline import Inline
 from ._queue import Queue
+from ._ratelimit import TokenBucket
 from ._thumbnails import Thumbnail
 from ._utilities import Utilities
 
@@ -0,0 +1,46 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import time
+
+
+class Clock:
+    def __init__(self):
+        # chat_id -> [start, paused_at]; start is shifted forward by every
+        # pause, so it always holds the start time minus the paused time.
+        self.clocks: dict[int, list[float]] = {}
+
+    def start(self, chat_id: int, position: int = 0) -> None:
+        """Start the clock of a chat at the given position in seconds."""
+        self.clocks[chat_id] = [time.monotonic() - position, 0.0]
+
+    def pause(self, chat_id: int) -> None:
+        """Freeze the clock of a chat at its current position."""
+        clock = self.clocks.get(chat_id)
+        if clock and not clock[1]:
+            clock[1] = time.monotonic()
+
+    def resume(self, chat_id: int) -> None:
+        """Continue a paused clock without counting the paused time."""
+        clock = self.clocks.get(chat_id)
+        if clock and clock[1]:
+            clock[0] += time.monotonic() - clock[1]
+            clock[1] = 0.0
+
+    def seek(self, chat_id: int, position: int) -> None:
+        """Move the clock of a chat to the given position, keeping its pause state."""
+        paused_at = self.clocks[chat_id][1] if chat_id in self.clocks else 0.0
+        self.clocks[chat_id] = [(paused_at or time.monotonic()) - position, paused_at]
+
+    def position(self, chat_id: int) -> int:
+        """Return the played seconds of the current media of a chat."""
+        clock = self.clocks.get(chat_id)
+        if not clock:
+            return 0
+        return int((clock[1] or time.monotonic()) - clock[0])
+
+    def stop(self, chat_id: int) -> None:
+        """Drop the clock of a chat."""
+        self.clocks.pop(chat_id, None)
@@ -15,7 +15,6 @@ class Media:
     message_id: int = 0
     title: str = None
     url: str = None
-    time: int = 0
     user: str = None
     video: bool = False
 
@@ -30,7 +29,6 @@ class Track:
     url: str = None
     file_path: str = None
     message_id: int = 0
-    time: int = 0
     thumbnail: str = None
     user: str = None
     view_count: str = None
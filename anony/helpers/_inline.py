@@ -13,6 +13,7 @@ class Inline:
     def __init__(self):
         self.ikm = types.InlineKeyboardMarkup
         self.ikb = types.InlineKeyboardButton
+        self.lang_markups = {}
 
     def cancel_dl(self, text) -> types.InlineKeyboardMarkup:
         return self.ikm([[self.ikb(text=text, callback_data=f"cancel_dl")]])
@@ -68,6 +69,8 @@ class Inline:
         return self.ikm(rows)
 
     def lang_markup(self, _lang: str) -> types.InlineKeyboardMarkup:
+        if _lang in self.lang_markups:
+            return self.lang_markups[_lang]
         langs = lang.get_languages()
 
         buttons = [
@@ -78,7 +81,8 @@ class Inline:
             for code, name in langs.items()
         ]
         rows = [buttons[i : i + 2] for i in range(0, len(buttons), 2)]
-        return self.ikm(rows)
+        self.lang_markups[_lang] = self.ikm(rows)
+        return self.lang_markups[_lang]
 
     def ping_markup(self, text: str) -> types.InlineKeyboardMarkup:
         return self.ikm([[self.ikb(text=text, url=config.SUPPORT_CHAT)]])
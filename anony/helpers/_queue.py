@@ -57,6 +57,10 @@ class Queue:
         self.queues[chat_id].popleft()
         return self.queues[chat_id][0] if self.queues[chat_id] else None
 
+    def in_use(self) -> set[str]:
+        """Return the IDs of the items in all the queues, whose files must be kept."""
+        return {item.id for items in self.queues.values() for item in items}
+
     def get_queue(self, chat_id: int) -> list[MediaItem]:
         """Return the full queue including the currently playing item."""
         return list(self.queues[chat_id])
@@ -5,20 +5,58 @@
 
 import os
 import aiohttp
-from PIL import (Image, ImageDraw, ImageEnhance,
-                 ImageFilter, ImageFont, ImageOps)
 
-from anony import config
+from anony import config, metrics, workers
 from anony.helpers import Track
 
+RECT = (914, 514)
+FILL = (255, 255, 255)
+_fonts = []
+
+
+def render(
+    temp: str,
+    output: str,
+    channel: str,
+    views: str,
+    title: str,
+    duration: str,
+    size: tuple[int, int],
+) -> str:
+    """Render the thumbnail image. Runs in a worker process."""
+    from PIL import (Image, ImageDraw, ImageEnhance,
+                     ImageFilter, ImageFont, ImageOps)
+
+    if not _fonts:
+        _fonts.append(ImageFont.truetype("anony/helpers/Raleway-Bold.ttf", 30))
+        _fonts.append(ImageFont.truetype("anony/helpers/Inter-Light.ttf", 30))
+    font1, font2 = _fonts
+
+    thumb = Image.open(temp).convert("RGBA").resize(size, Image.Resampling.LANCZOS)
+    blur = thumb.filter(ImageFilter.GaussianBlur(25))
+    image = ImageEnhance.Brightness(blur).enhance(.40)
+
+    mask = Image.new("L", RECT, 0)
+    _rect = ImageOps.fit(thumb, RECT, method=Image.LANCZOS, centering=(0.5, 0.5))
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, RECT[0], RECT[1]), radius=15, fill=255)
+    _rect.putalpha(mask)
+    image.paste(_rect, (183, 30), _rect)
+
+    draw = ImageDraw.Draw(image)
+    draw.text((50, 560), f"{channel[:25]} | {views}", font=font2, fill=FILL)
+    draw.text((50, 600), title[:50], font=font1, fill=FILL)
+    draw.text((40, 650), "0:01", font=font1)
+    draw.line([(140, 670), (1160, 670)], fill=FILL, width=5, joint="curve")
+    draw.text((1185, 650), duration, font=font1, fill=FILL)
+
+    image.save(output)
+    return output
+
 
 class Thumbnail:
     def __init__(self):
-        self.rect = (914, 514)
-        self.fill = (255, 255, 255)
-        self.mask = Image.new("L", self.rect, 0)
-        self.font1 = ImageFont.truetype("anony/helpers/Raleway-Bold.ttf", 30)
-        self.font2 = ImageFont.truetype("anony/helpers/Inter-Light.ttf", 30)
+        self.rect = RECT
+        self.fill = FILL
 
     async def save_thumb(self, output_path: str, url: str) -> str:
         async with aiohttp.ClientSession() as session:
@@ -33,25 +71,19 @@ class Thumbnail:
             if os.path.exists(output):
                 return output
 
-            await self.save_thumb(temp, song.thumbnail)
-            thumb = Image.open(temp).convert("RGBA").resize(size, Image.Resampling.LANCZOS)
-            blur = thumb.filter(ImageFilter.GaussianBlur(25))
-            image = ImageEnhance.Brightness(blur).enhance(.40)
-
-            _rect = ImageOps.fit(thumb, self.rect, method=Image.LANCZOS, centering=(0.5, 0.5))
-            ImageDraw.Draw(self.mask).rounded_rectangle((0, 0, self.rect[0], self.rect[1]), radius=15, fill=255)
-            _rect.putalpha(self.mask)
-            image.paste(_rect, (183, 30), _rect)
-
-            draw = ImageDraw.Draw(image)
-            draw.text((50, 560), f"{song.channel_name[:25]} | {song.view_count}", font=self.font2, fill=self.fill)
-            draw.text((50, 600), song.title[:50], font=self.font1, fill=self.fill)
-            draw.text((40, 650), "0:01", font=self.font1)
-            draw.line([(140, 670), (1160, 670)], fill=self.fill, width=5, joint="curve")
-            draw.text((1185, 650), song.duration, font=self.font1, fill=self.fill)
-
-            image.save(output)
+            with metrics.thumbnails.time():
+                await self.save_thumb(temp, song.thumbnail)
+                await workers.run(
+                    render,
+                    temp,
+                    output,
+                    song.channel_name,
+                    song.view_count,
+                    song.title,
+                    song.duration,
+                    size,
+                )
             os.remove(temp)
             return output
         except Exception:
-            config.DEFAULT_THUMB
+            return config.DEFAULT_THUMB
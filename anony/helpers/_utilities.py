@@ -3,17 +3,45 @@
 # This file is part of AnonXMusic
 
 
+import os
 import re
 
 from pyrogram import enums, types
 
-from anony import app
+from anony import app, logger
 
 
 class Utilities:
     def __init__(self):
         pass
 
+    def evict(
+        self, files: list[tuple[str, str, int, float]], quota: int, keep: set[str]
+    ) -> list[str]:
+        """
+        Delete the least recently used files until they fit in `quota` bytes.
+
+        `files` holds (key, path, size, last used) tuples, files whose key
+        is in `keep` are never deleted. Returns the keys of the deleted files.
+        """
+        total = sum(size for _, _, size, _ in files)
+        evicted = []
+        for key, path, size, _ in sorted(files, key=lambda x: x[3]):
+            if total <= quota:
+                break
+            if key in keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as ex:
+                logger.warning(f"Failed to evict {path}: {ex}")
+                continue
+            total -= size
+            evicted.append(key)
+        return evicted
+
     def format_eta(self, seconds: int) -> str:
         if seconds < 60:
             return f"{seconds}s"
@@ -7,7 +7,7 @@ import re
 
 from pyrogram import errors, filters, types
 
-from anony import anon, app, db, lang, queue, tg, yt
+from anony import anon, app, db, lang, queue, tg
 from anony.helpers import admin_check, buttons, can_manage_vc
 
 
@@ -70,25 +70,9 @@ async def _controls(_, query: types.CallbackQuery):
         reply = query.lang["play_skipped"].format(user)
 
     elif action == "force":
-        pos, media = queue.check_item(chat_id, args[3])
-        if not media or pos == -1:
+        if not await anon.force_play(chat_id, args[3]):
             return await query.edit_message_text(query.lang["play_expired"])
-
-        m_id = queue.get_current(chat_id).message_id
-        queue.force_add(chat_id, media, remove=pos)
-        try:
-            await app.delete_messages(
-                chat_id=chat_id, message_ids=[m_id, media.message_id], revoke=True
-            )
-            media.message_id = None
-        except Exception:
-            pass
-
-        msg = await app.send_message(chat_id=chat_id, text=query.lang["play_next"])
-        if not media.file_path:
-            media.file_path = await yt.download(media.id, video=media.video)
-        media.message_id = msg.id
-        return await anon.play_media(chat_id, msg, media)
+        return
 
     elif action == "replay":
         media = queue.get_current(chat_id)
@@ -3,7 +3,6 @@
 # This file is part of AnonXMusic
 
 
-from py_yt import VideosSearch
 from pyrogram import types
 
 from anony import app
@@ -16,6 +15,8 @@ async def inline_query_handler(_, query: types.InlineQuery):
     if not text:
         return
 
+    from py_yt import VideosSearch
+
     try:
         search = VideosSearch(text, limit=15)
         results = (await search.next()).get("result", [])
@@ -39,3 +39,16 @@ async def _lang_cb(_, query: types.CallbackQuery):
     await query.answer(query.lang["lang_change"].format(_lang), show_alert=True)
     await db.set_lang(query.message.chat.id, _lang)
     await query.edit_message_text(query.lang["lang_changed"].format(_lang))
+
+
+@app.on_message(filters.command(["reloadlang"]) & app.sudoers)
+@lang.language()
+async def _reload_lang(_, m: types.Message):
+    try:
+        fallen = lang.load_files()
+    except Exception as ex:
+        return await m.reply_text(m.lang["lang_reload_failed"].format(ex))
+
+    buttons.lang_markups.clear()
+    await m.reply_text(m.lang["lang_reloaded"].format(len(lang.languages), fallen))
+
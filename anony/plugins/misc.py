@@ -8,7 +8,7 @@ import time
 
 from pyrogram import enums, errors, filters, types
 
-from anony import anon, app, config, db, lang, queue, tasks, userbot, yt
+from anony import anon, app, clock, config, db, editor, lang, queue, tasks, userbot
 from anony.helpers import buttons
 
 
@@ -44,18 +44,6 @@ async def auto_leave():
                 continue
 
 
-async def track_time():
-    while True:
-        await asyncio.sleep(1)
-        for chat_id in list(db.active_calls):
-            if not await db.playing(chat_id):
-                continue
-            media = queue.get_current(chat_id)
-            if not media:
-                continue
-            media.time += 1
-
-
 async def update_timer(length=10):
     while True:
         await asyncio.sleep(7)
@@ -65,18 +53,13 @@ async def update_timer(length=10):
             try:
                 media = queue.get_current(chat_id)
                 duration, message_id = media.duration_sec, media.message_id
-                if not duration or not message_id or not media.time:
+                played = clock.position(chat_id)
+                if not duration or not message_id or not played:
                     continue
-                played = media.time
                 remaining = duration - played
                 pos = min(int((played / duration) * length), length - 1)
                 timer = "—" * pos + "◉" + "—" * (length - pos - 1)
 
-                if remaining <= 30:
-                    next = queue.get_next(chat_id, check=True)
-                    if next and not next.file_path:
-                        next.file_path = await yt.download(next.id, video=next.video)
-
                 if remaining < 10:
                     remove = True
                 else:
@@ -89,9 +72,9 @@ async def update_timer(length=10):
                 if not timer and not remove:
                     continue
 
-                await app.edit_message_reply_markup(
-                    chat_id=chat_id,
-                    message_id=message_id,
+                editor.edit(
+                    chat_id,
+                    message_id,
                     reply_markup=buttons.controls(
                         chat_id=chat_id, timer=timer, remove=remove
                     ),
@@ -100,32 +83,42 @@ async def update_timer(length=10):
                 pass
 
 
+async def check_vc(chat_id: int, limit: asyncio.Semaphore) -> None:
+    media = queue.get_current(chat_id)
+    if not media or clock.position(chat_id) <= 30:
+        return
+
+    async with limit:
+        if await anon.participants_count(chat_id) > 1:
+            return
+
+    _lang = await lang.get_lang(chat_id)
+    await anon.stop(chat_id)
+    try:
+        sent = await app.edit_message_reply_markup(
+            chat_id=chat_id,
+            message_id=media.message_id,
+            reply_markup=buttons.controls(
+                chat_id=chat_id, status=_lang["stopped"], remove=True
+            ),
+        )
+        await sent.reply_text(_lang["auto_left"])
+    except errors.MessageIdInvalid:
+        pass
+
+
 async def vc_watcher(sleep=15):
+    limit = asyncio.Semaphore(10)
     while True:
         await asyncio.sleep(sleep)
-        for chat_id in list(db.active_calls):
-            client = await db.get_assistant(chat_id)
-            media = queue.get_current(chat_id)
-            participants = await client.get_participants(chat_id)
-            if len(participants) < 2 and media.time > 30:
-                _lang = await lang.get_lang(chat_id)
-                try:
-                    sent = await app.edit_message_reply_markup(
-                        chat_id=chat_id,
-                        message_id=media.message_id,
-                        reply_markup=buttons.controls(
-                            chat_id=chat_id, status=_lang["stopped"], remove=True
-                        ),
-                    )
-                    await anon.stop(chat_id)
-                    await sent.reply_text(_lang["auto_left"])
-                except errors.MessageIdInvalid:
-                    pass
+        await asyncio.gather(
+            *(check_vc(chat_id, limit) for chat_id in list(db.active_calls)),
+            return_exceptions=True,
+        )
 
 
 if config.AUTO_END:
     tasks.append(asyncio.create_task(vc_watcher()))
 if config.AUTO_LEAVE:
     tasks.append(asyncio.create_task(auto_leave()))
-tasks.append(asyncio.create_task(track_time()))
 tasks.append(asyncio.create_task(update_timer()))
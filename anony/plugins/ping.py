@@ -4,10 +4,9 @@
 
 
 import time
-import psutil
 
 from pyrogram import filters, types
-from anony import app, anon, boot, config, lang
+from anony import app, anon, boot, config, lang, metrics
 from anony.helpers import buttons
 
 
@@ -25,9 +24,9 @@ async def _ping(_, m: types.Message):
             caption=m.lang["ping_pong"].format(
                 latency,
                 uptime,
-                psutil.cpu_percent(interval=0),
-                psutil.virtual_memory().percent,
-                psutil.disk_usage("/").percent,
+                metrics.system.get("host_cpu", 0),
+                metrics.system.get("ram_percent", 0),
+                metrics.system.get("disk_percent", 0),
                 await anon.ping(),
             )
         ),
@@ -7,7 +7,7 @@ from pathlib import Path
 
 from pyrogram import filters, types
 
-from anony import anon, app, config, db, lang, queue, tg, yt
+from anony import anon, app, config, db, lang, queue, server, tg, yt
 from anony.helpers import buttons, utils
 # Removed checkUB import to prevent assistant None error
 
@@ -17,6 +17,7 @@ def playlist_to_queue(chat_id: int, tracks: list) -> str:
         pos = queue.add(chat_id, track)
         text += f"<b>{pos}.</b> {track.title}\n"
     text = text[:1948] + "</blockquote>"
+    anon.preload_next(chat_id)
     return text
 
 @app.on_message(
@@ -87,11 +88,15 @@ async def play_hndlr(
 
     file.user = mention
     if force:
+        current = queue.get_current(m.chat.id)
         queue.force_add(m.chat.id, file)
+        server.release(current)
     else:
         position = queue.add(m.chat.id, file)
 
         if position != 0 or await db.get_call(m.chat.id):
+            if position == 1:
+                anon.preload_next(m.chat.id)
             await sent.edit_text(
                 m.lang["play_queued"].format(
                     position,
@@ -5,12 +5,15 @@
 
 import os
 import sys
+import html
 import shutil
 import asyncio
+import tempfile
+from io import BytesIO
 
 from pyrogram import filters, types
 
-from anony import app, db, lang, stop
+from anony import app, db, lang, profiler, stop
 
 
 @app.on_message(filters.command(["logs"]) & app.sudoers)
@@ -59,3 +62,85 @@ async def _restart(_, m: types.Message):
     except Exception: pass
 
     os.execl(sys.executable, sys.executable, "-m", "anony")
+
+
+# Plugins schedule tasks at import, so they're imported in a running loop,
+# in a stable order. Failed imports are printed and fail the run.
+IMPORT_CODE = """
+import asyncio, importlib, sys
+async def main():
+    import anony.plugins as p
+    failed = []
+    for name in sorted(p.all_modules):
+        try:
+            importlib.import_module(f"anony.plugins.{name}")
+        except Exception as ex:
+            failed.append(f"{name}: {type(ex).__name__}: {ex}")
+    print("\\n".join(failed))
+    sys.exit(1 if failed else 0)
+asyncio.run(main())
+"""
+
+
+@app.on_message(filters.command(["importtime"]) & app.sudoers)
+@lang.language()
+async def _importtime(_, m: types.Message):
+    sent = await m.reply_text(m.lang["importtime_running"])
+    # A scratch directory keeps the log file and the cache directories
+    # created at import away from the ones of the running bot.
+    with tempfile.TemporaryDirectory() as workdir:
+        os.symlink(os.path.abspath("anony"), os.path.join(workdir, "anony"))
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-X", "importtime", "-c", IMPORT_CODE,
+            cwd=workdir,
+            env={**os.environ, "PYTHONPATH": os.getcwd()},
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await proc.communicate()
+
+    stderr = stderr.decode(errors="ignore")
+    if proc.returncode:
+        error = stdout.decode(errors="ignore").strip() or stderr.strip().rsplit("\n", 1)[-1]
+        return await sent.edit_text(
+            m.lang["importtime_failed"].format(html.escape(error[-3000:]))
+        )
+
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _self, cumulative, name = line[12:].split("|", 2)
+        imports.append((int(cumulative), int(_self), name.strip()))
+    if not imports:
+        return await sent.edit_text(m.lang["importtime_failed"].format("-"))
+
+    total = sum(_self for _, _self, _ in imports)
+    top = sorted(imports, key=lambda x: x[1], reverse=True)[:20]
+    lines = "\n".join(
+        f"{_self / 1000:7.1f} {cumulative / 1000:7.1f}  {name}" for cumulative, _self, name in top
+    )
+    await sent.edit_text(m.lang["importtime"].format(total / 1000, len(imports), lines))
+
+
+@app.on_message(filters.command(["profile"]) & app.sudoers)
+@lang.language()
+async def _profile(_, m: types.Message):
+    limit = 120
+    seconds = m.command[1] if len(m.command) > 1 else "10"
+    if not seconds.isdigit() or not 0 < int(seconds) <= limit:
+        return await m.reply_text(m.lang["profile_usage"].format(m.command[0], limit))
+    if profiler.running:
+        return await m.reply_text(m.lang["profile_busy"])
+
+    sent = await m.reply_text(m.lang["profile_running"].format(seconds))
+    stacks, samples = await profiler.profile(int(seconds))
+    total = sum(stacks.values()) or 1
+    lines = "\n".join(
+        f"{count:6} {count * 100 / total:5.1f}%  {name}" for name, count in profiler.top(stacks)
+    )
+    await sent.edit_text(m.lang["profile"].format(samples, seconds, lines))
+
+    report = BytesIO(profiler.collapse(stacks).encode())
+    report.name = "profile.txt"
+    await m.reply_document(report, caption=m.lang["profile_sent"].format(app.name))
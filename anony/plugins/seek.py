@@ -5,7 +5,7 @@
 
 from pyrogram import filters, types
 
-from anony import anon, app, db, lang, queue
+from anony import anon, app, clock, db, lang, queue
 from anony.helpers import can_manage_vc
 
 
@@ -36,17 +36,16 @@ async def _seek(_, m: types.Message):
     sent = await m.reply_text(m.lang["play_seeking"])
     if m.command[0] == "seekback":
         stype = m.lang["backward"]
-        start_from = media.time - to_seek
+        start_from = clock.position(m.chat.id) - to_seek
         if start_from < 1:
             start_from = 1
     else:
         stype = m.lang["forward"]
-        start_from = media.time + to_seek
+        start_from = clock.position(m.chat.id) + to_seek
         if start_from + 10 > media.duration_sec:
             start_from = media.duration_sec - 5
 
-    await anon.play_media(m.chat.id, sent, media, start_from)
-    media.time = start_from
+    await anon.seek(m.chat.id, sent, start_from)
     await sent.edit_text(
         m.lang["play_seeked"].format(stype, start_from, m.from_user.mention)
     )
@@ -3,27 +3,20 @@
 # This file is part of AnonXMusic
 
 
-import os
 import platform
 import sys
 
-import psutil
 from pyrogram import __version__, filters, types
 from pytgcalls import __version__ as pytgver
 
-from anony import app, config, db, lang, userbot
+from anony import anon, app, config, db, lang, metrics, userbot
 from anony.plugins import all_modules
 
 
 @app.on_message(filters.command(["stats"]) & filters.group & ~app.bl_users)
 @lang.language()
 async def _stats(_, m: types.Message):
-    sent = await m.reply_photo(
-        photo=config.PING_IMG,
-        caption=m.lang["stats_fetching"],
-    )
-
-    pid = os.getpid()
+    system = metrics.system
     _utext = m.lang["stats_user"].format(
         app.name,
         len(userbot.clients),
@@ -31,23 +24,32 @@ async def _stats(_, m: types.Message):
         len(db.blacklisted),
         len(app.bl_users),
         len(app.sudoers),
-        len(await db.get_chats()),
-        len(await db.get_users()),
+        system.get("chats", len(db.chats)),
+        system.get("users", len(db.users)),
+    )
+    _utext += m.lang["stats_quality"].format(anon.quality.profile(), anon.quality.load())
+
+    p95 = metrics.plays.quantile(0.95)
+    yt_hits = metrics.hit_rate(("cache",), ("api", "ytdlp"))
+    tg_hits = metrics.hit_rate(("store",), ("telegram",))
+    _utext += m.lang["stats_throughput"].format(
+        metrics.plays_per_minute(),
+        f"{p95:.2f}s" if p95 is not None else "-",
+        f"{yt_hits}%" if yt_hits is not None else "-",
+        f"{tg_hits}%" if tg_hits is not None else "-",
     )
     if m.from_user.id in app.sudoers:
-        process = psutil.Process(pid)
-        storage = psutil.disk_usage("/")
         _utext += m.lang["stats_sudo"].format(
             len(all_modules),
             platform.system(),
-            f"{process.memory_info().rss / 1024**2:.2f}",
-            round(psutil.virtual_memory().total / (1024.0**3)),
-            process.cpu_percent(interval=1.0),
-            psutil.cpu_count(logical=False),
-            f"{storage.used / (1024.0**3):.2f}",
-            f"{storage.total / (1024.0**3):.2f}",
+            f"{system.get('rss', 0) / 1024**2:.2f}",
+            round(system.get("ram_total", 0) / (1024.0**3)),
+            system.get("cpu", 0),
+            system.get("cores", 0),
+            f"{system.get('disk_used', 0) / (1024.0**3):.2f}",
+            f"{system.get('disk_total', 0) / (1024.0**3):.2f}",
             sys.version.split()[0],
             __version__,
             pytgver,
         )
-    await sent.edit_caption(_utext)
+    await m.reply_photo(photo=config.PING_IMG, caption=_utext)
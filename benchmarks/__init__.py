@@ -0,0 +1,45 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def environ(**overrides: str) -> None:
+    """Set dummy credentials and settings, so the package imports offline."""
+    os.environ.update(
+        {
+            "API_ID": "1",
+            "API_HASH": "benchmark",
+            "BOT_TOKEN": "1:benchmark",
+            "MONGO_URL": "mongodb://127.0.0.1:27017",
+            "LOGGER_ID": "-1001",
+            "OWNER_ID": "1",
+            "SESSION": "benchmark",
+            "QUALITY": "high",
+            "THUMB_GEN": "False",
+            "TRANSCODE_CACHE": "False",
+            "WORKERS": "1",
+            **overrides,
+        }
+    )
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+
+
+def workdir() -> str:
+    """
+    Move into a temporary directory, so the files the package writes don't
+    mix with the real ones. Locales and fonts are read relative to the
+    working directory, so the package is linked in.
+    """
+    path = tempfile.mkdtemp(prefix="anony-bench-")
+    os.symlink(ROOT / "anony", os.path.join(path, "anony"))
+    os.chdir(path)
+    return path
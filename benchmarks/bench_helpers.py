@@ -0,0 +1,63 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import pytest
+from pyrogram import enums, types
+
+from anony import db, lang
+from anony.helpers import buttons, utils
+from anony.helpers._thumbnails import render
+from benchmarks.conftest import drive
+
+URL = "https://youtu.be/dQw4w9WgXcQ?si=abcdefghijklmnop"
+
+
+@pytest.mark.parametrize("duration", ["42", "03:25", "01:02:03"])
+def bench_to_seconds(benchmark, duration):
+    benchmark(utils.to_seconds, duration)
+
+
+def bench_get_url(benchmark):
+    text = f"/play {URL}"
+    msg = types.Message(
+        id=1,
+        text=text,
+        entities=[
+            types.MessageEntity(
+                type=enums.MessageEntityType.URL, offset=text.index(URL), length=len(URL)
+            )
+        ],
+    )
+    assert benchmark(utils.get_url, msg) == URL.split("?si")[0]
+
+
+@pytest.mark.parametrize("timer", [None, "01:23 ━━━━●────── 03:45"], ids=["plain", "timer"])
+def bench_controls(benchmark, timer):
+    benchmark(buttons.controls, -1001000000000, timer=timer)
+
+
+@pytest.mark.parametrize("code", ["en", "hi"])
+def bench_format_play_media(benchmark, code):
+    text = lang.languages[code]["play_media"]
+    benchmark(text.format, "https://youtu.be/dQw4w9WgXcQ", "Title", "03:45", "User")
+
+
+def bench_get_lang(benchmark):
+    db.lang[-1001000000000] = "hi"
+    benchmark(lambda: drive(lang.get_lang(-1001000000000)))
+
+
+def bench_thumbnail_render(benchmark, tmp_path):
+    from PIL import Image
+
+    temp = tmp_path / "temp.jpg"
+    Image.new("RGB", (1280, 720), (90, 40, 160)).save(temp)
+    benchmark.pedantic(
+        render,
+        args=(str(temp), str(tmp_path / "out.png"), "Channel", "1.2M views",
+              "A fairly long song title to wrap", "03:45", (1280, 720)),
+        rounds=5,
+        warmup_rounds=1,
+    )
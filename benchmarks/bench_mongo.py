@@ -0,0 +1,39 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import pytest
+
+from anony import db
+from benchmarks.conftest import drive
+
+USERS = 1_000_000
+
+
+@pytest.fixture(scope="module")
+def users():
+    cached = db.users[:], db.chats[:], dict(db.active_calls)
+    db.users[:] = range(USERS)
+    db.chats[:] = range(-1001000000000, -1001000000000 - USERS // 10, -1)
+    db.active_calls.update({chat_id: 1 for chat_id in db.chats[:1000]})
+    yield
+    db.users[:], db.chats[:] = cached[0], cached[1]
+    db.active_calls.clear()
+    db.active_calls.update(cached[2])
+
+
+def bench_is_user_hit(benchmark, users):
+    assert benchmark(lambda: drive(db.is_user(USERS - 1)))
+
+
+def bench_is_user_miss(benchmark, users):
+    assert not benchmark(lambda: drive(db.is_user(-1)))
+
+
+def bench_is_chat_miss(benchmark, users):
+    assert not benchmark(lambda: drive(db.is_chat(1)))
+
+
+def bench_get_call(benchmark, users):
+    assert benchmark(lambda: drive(db.get_call(-1001000000000)))
@@ -0,0 +1,55 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import pytest
+
+from anony.helpers import Queue, Track
+
+SIZES = [100, 10_000]
+
+
+def filled(size: int) -> Queue:
+    queue = Queue()
+    for i in range(size):
+        queue.add(1, Track(id=f"{i:011d}", duration_sec=180))
+    return queue
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_add(benchmark, size):
+    benchmark(filled, size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_check_item_last(benchmark, size):
+    queue = filled(size)
+    assert benchmark(queue.check_item, 1, f"{size - 1:011d}")[0] == size - 1
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_get_queue(benchmark, size):
+    queue = filled(size)
+    benchmark(queue.get_queue, 1)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_get_next(benchmark, size):
+    queue = filled(size)
+
+    def next_track():
+        queue.add(1, queue.get_next(1))
+
+    benchmark(next_track)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def bench_force_add_middle(benchmark, size):
+    queue = filled(size)
+
+    def force():
+        queue.force_add(1, queue.get_current(1), remove=size // 2)
+        queue.add(1, Track(id="x", duration_sec=180))
+
+    benchmark(force)
@@ -0,0 +1,36 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+"""
+Microbenchmarks of the hot data paths.
+
+    pip install -r benchmarks/requirements.txt
+    python -m pytest benchmarks
+
+Every run is saved under benchmarks/results and compared with the last
+saved run of the same machine. Only the baseline runs are committed, the
+later ones are ignored by git. Add --benchmark-compare-fail=median:25%
+to fail on regressions, e.g. after upgrading a dependency.
+"""
+
+import pytest
+
+from benchmarks import ROOT, environ, workdir
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    if config.option.benchmark_storage == "file://./.benchmarks":
+        config.option.benchmark_storage = f"file://{ROOT / 'benchmarks' / 'results'}"
+    environ()
+    workdir()
+
+
+def drive(coro):
+    """Run a coroutine that never suspends, without an event loop."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("The coroutine suspended.")
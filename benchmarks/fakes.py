@@ -0,0 +1,388 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+"""
+Local stand-ins for Telegram, PyTgCalls, MongoDB and the download API.
+
+Each fake answers after a configurable delay, so the real bot code runs
+against something that behaves like the network without touching it.
+"""
+
+import asyncio
+import copy
+import itertools
+import random
+import secrets
+
+from aiohttp import web
+from pyrogram import enums, types
+from pytgcalls.types import Device, StreamEnded
+
+
+async def delay(latency: float) -> None:
+    """Sleep around `latency`, jittered like a network round trip."""
+    if latency:
+        await asyncio.sleep(random.uniform(latency * 0.5, latency * 1.5))
+
+
+# TELEGRAM
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.is_bot = False
+        self.username = f"user{user_id}"
+        self.first_name = f"User {user_id}"
+        self.mention = f'<a href="tg://user?id={user_id}">{self.first_name}</a>'
+
+
+class FakeChat:
+    def __init__(self, chat_id: int):
+        self.id = chat_id
+        self.title = f"Chat {chat_id}"
+        self.type = enums.ChatType.SUPERGROUP
+        self.username = None
+        self.invite_link = None
+
+
+class FakeMessage(types.Message):
+    ids = itertools.count(1)
+
+    def __init__(self, bot: "FakeBot", chat: FakeChat, user: FakeUser | None, text: str = ""):
+        self.bot = bot
+        self.id = next(self.ids)
+        self.chat = chat
+        self.from_user = user
+        self.text = text
+        self.command = text.lstrip("/").split() if text.startswith("/") else None
+        self.reply_to_message = None
+
+    async def reply_text(self, text: str, **kwargs) -> "FakeMessage":
+        return await self.bot.send_message(self.chat.id, text, **kwargs)
+
+    async def reply_photo(self, photo, caption: str = "", **kwargs) -> "FakeMessage":
+        return await self.bot.send_photo(self.chat.id, photo, caption=caption, **kwargs)
+
+    async def edit_text(self, text: str, **kwargs) -> "FakeMessage":
+        await self.bot.call("edit_message_text")
+        self.text = text
+        return self
+
+    async def edit_caption(self, caption: str, **kwargs) -> "FakeMessage":
+        return await self.edit_text(caption)
+
+    async def edit_media(self, media, **kwargs) -> "FakeMessage":
+        return await self.edit_text(getattr(media, "caption", ""))
+
+    async def delete(self, revoke: bool = True) -> None:
+        await self.bot.call("delete_messages")
+
+
+class FakeBot:
+    def __init__(self, latency: float = 0.05):
+        """The Bot API methods the playback path uses, counted by name."""
+        self.latency = latency
+        self.calls: dict[str, int] = {}
+        self.chats: dict[int, FakeChat] = {}
+
+    async def call(self, method: str) -> None:
+        self.calls[method] = self.calls.get(method, 0) + 1
+        await delay(self.latency)
+
+    def chat(self, chat_id: int) -> FakeChat:
+        if chat_id not in self.chats:
+            self.chats[chat_id] = FakeChat(chat_id)
+        return self.chats[chat_id]
+
+    async def send_message(self, chat_id: int, text: str, **kwargs) -> FakeMessage:
+        await self.call("send_message")
+        return FakeMessage(self, self.chat(chat_id), None, text)
+
+    async def send_photo(self, chat_id: int, photo, caption: str = "", **kwargs) -> FakeMessage:
+        await self.call("send_photo")
+        return FakeMessage(self, self.chat(chat_id), None, caption)
+
+    async def edit_message_text(self, chat_id: int, message_id: int, text: str, **kwargs) -> None:
+        await self.call("edit_message_text")
+
+    async def delete_messages(self, chat_id: int, message_ids, revoke: bool = True) -> None:
+        await self.call("delete_messages")
+
+    async def get_chat_member(self, chat_id: int, user_id: int):
+        await self.call("get_chat_member")
+
+    async def get_chat_members(self, chat_id: int, **kwargs):
+        await self.call("get_chat_members")
+        return
+        yield
+
+    def install(self, app) -> None:
+        """Route the methods of the real client to the fake."""
+        for name in (
+            "send_message", "send_photo", "edit_message_text",
+            "delete_messages", "get_chat_member", "get_chat_members",
+        ):
+            setattr(app, name, getattr(self, name))
+
+
+class FakeAssistant:
+    def __init__(self, num: int):
+        self.id = 1000 + num
+        self.is_connected = True
+        self.name = f"Assistant {num}"
+
+
+# PYTGCALLS
+
+class FakeCalls:
+    def __init__(self, latency: float = 0.2, speed: float = 60.0):
+        """
+        Answers like a PyTgCalls client. Every stream that starts ends
+        `duration / speed` seconds later with a StreamEnded update.
+        """
+        self.latency = latency
+        self.speed = speed
+        self.ping = latency * 1000
+        self.handlers = []
+        self.ends: dict[int, asyncio.TimerHandle] = {}
+        self.streams = 0
+        self.ended = 0
+
+    def on_update(self, *args):
+        def decorator(func):
+            self.handlers.append(func)
+            return func
+
+        return decorator
+
+    def end(self, chat_id: int) -> None:
+        self.ends.pop(chat_id, None)
+        self.ended += 1
+        update = StreamEnded(chat_id, StreamEnded.Type.AUDIO, Device.MICROPHONE)
+        for handler in self.handlers:
+            asyncio.create_task(handler(self, update))
+
+    async def play(self, chat_id: int, stream=None, config=None) -> None:
+        await delay(self.latency)
+        self.streams += 1
+        old = self.ends.pop(chat_id, None)
+        if old:
+            old.cancel()
+        from anony import queue
+
+        media = queue.get_current(chat_id)
+        duration = (media.duration_sec if media else 0) or 180
+        self.ends[chat_id] = asyncio.get_running_loop().call_later(
+            duration / self.speed, self.end, chat_id
+        )
+
+    async def pause(self, chat_id: int) -> bool:
+        await delay(self.latency / 4)
+        return True
+
+    async def resume(self, chat_id: int) -> bool:
+        await delay(self.latency / 4)
+        return True
+
+    async def leave_call(self, chat_id: int, close: bool = False) -> None:
+        await delay(self.latency / 4)
+        old = self.ends.pop(chat_id, None)
+        if old:
+            old.cancel()
+
+    async def get_participants(self, chat_id: int) -> list:
+        await delay(self.latency / 4)
+        return []
+
+
+# MONGODB
+
+class FakeCursor:
+    def __init__(self, docs: list[dict], latency: float):
+        self.docs = docs
+        self.latency = latency
+
+    def __aiter__(self):
+        return self.iterate()
+
+    async def iterate(self):
+        await delay(self.latency)
+        for doc in self.docs:
+            yield doc
+
+
+class FakeCollection:
+    def __init__(self, latency: float = 0.002):
+        """In-memory collection with the operators the bot uses."""
+        self.latency = latency
+        self.docs: dict = {}
+
+    def match(self, doc: dict, query: dict) -> bool:
+        for key, value in query.items():
+            if isinstance(value, dict) and "$in" in value:
+                if doc.get(key) not in value["$in"]:
+                    return False
+            elif doc.get(key) != value:
+                return False
+        return True
+
+    def matching(self, query: dict | None) -> list[dict]:
+        if query and "_id" in query and not isinstance(query["_id"], dict):
+            doc = self.docs.get(query["_id"])
+            return [doc] if doc and self.match(doc, query) else []
+        return [doc for doc in self.docs.values() if self.match(doc, query or {})]
+
+    async def find_one(self, query: dict | None = None) -> dict | None:
+        await delay(self.latency)
+        docs = self.matching(query)
+        return copy.deepcopy(docs[0]) if docs else None
+
+    def find(self, query: dict | None = None) -> FakeCursor:
+        return FakeCursor([copy.deepcopy(doc) for doc in self.matching(query)], self.latency)
+
+    async def insert_one(self, doc: dict) -> None:
+        await delay(self.latency)
+        self.docs[doc.get("_id", secrets.token_hex(12))] = copy.deepcopy(doc)
+
+    async def insert_many(self, docs: list[dict]) -> None:
+        for doc in docs:
+            await self.insert_one(doc)
+
+    async def replace_one(self, query: dict, doc: dict, upsert: bool = False) -> None:
+        await delay(self.latency)
+        if self.matching(query) or upsert:
+            self.docs[doc.get("_id", query.get("_id"))] = copy.deepcopy(doc)
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False) -> None:
+        await delay(self.latency)
+        docs = self.matching(query)
+        if not docs:
+            if not upsert:
+                return
+            docs = [{"_id": query.get("_id")}]
+            self.docs[query.get("_id")] = docs[0]
+        doc = docs[0]
+        for key, value in update.get("$set", {}).items():
+            doc[key] = value
+        for key, value in update.get("$addToSet", {}).items():
+            if value not in doc.setdefault(key, []):
+                doc[key].append(value)
+        for key, value in update.get("$pull", {}).items():
+            doc[key] = [item for item in doc.get(key, []) if item != value]
+
+    async def delete_one(self, query: dict) -> None:
+        await delay(self.latency)
+        for doc in self.matching(query)[:1]:
+            self.docs.pop(doc["_id"], None)
+
+    async def delete_many(self, query: dict) -> None:
+        await delay(self.latency)
+        for doc in self.matching(query):
+            self.docs.pop(doc["_id"], None)
+
+    async def drop(self) -> None:
+        self.docs.clear()
+
+
+class FakeDatabase:
+    def __init__(self, latency: float = 0.002):
+        self.latency = latency
+        self.collections: dict[str, FakeCollection] = {}
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if name not in self.collections:
+            self.collections[name] = FakeCollection(self.latency)
+        return self.collections[name]
+
+    async def command(self, *args, **kwargs) -> dict:
+        await delay(self.latency)
+        return {"ok": 1}
+
+
+class FakeMongo(FakeDatabase):
+    """Stands in for AsyncMongoClient: attributes are databases."""
+
+    def __getattr__(self, name: str) -> FakeDatabase:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if name not in self.collections:
+            self.collections[name] = FakeDatabase(self.latency)
+        return self.collections[name]
+
+    async def close(self) -> None:
+        pass
+
+    def install(self, db) -> None:
+        """Point the collections of the real MongoDB wrapper at the fake."""
+        db.mongo = self
+        db.db = self.Anon
+        for attr, collection in (
+            ("assistantdb", "assistant"), ("authdb", "auth"), ("broadcastdb", "broadcasts"),
+            ("cache", "cache"), ("chatsdb", "chats"), ("langdb", "lang"), ("usersdb", "users"),
+        ):
+            setattr(db, attr, getattr(db.db, collection))
+
+
+# DOWNLOAD API
+
+class FakeAPI:
+    def __init__(self, size: int = 256 * 1024, latency: float = 0.3, rate: float = 0):
+        """
+        Mimics the /download and /stream endpoints of the download API.
+        Streams `size` bytes per file, at `rate` bytes/s when set.
+        """
+        self.size = size
+        self.latency = latency
+        self.rate = rate
+        self.tokens: set[str] = set()
+        self.requests = 0
+        self.aborted = 0
+        self.runner = None
+        self.url = None
+        self.web = web.Application()
+        self.web.router.add_get("/download", self.download)
+        self.web.router.add_get("/stream/{video_id}", self.stream)
+
+    async def download(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await delay(self.latency)
+        token = secrets.token_hex(8)
+        self.tokens.add(token)
+        return web.json_response({"status": "success", "download_token": token})
+
+    async def stream(self, request: web.Request) -> web.StreamResponse:
+        token = request.headers.get("X-Download-Token")
+        if token not in self.tokens:
+            raise web.HTTPForbidden()
+        self.tokens.discard(token)
+        await delay(self.latency)
+
+        response = web.StreamResponse(headers={"Content-Type": "audio/mpeg"})
+        response.content_length = self.size
+        chunk = 64 * 1024
+        try:
+            await response.prepare(request)
+            for start in range(0, self.size, chunk):
+                await response.write(b"\0" * min(chunk, self.size - start))
+                if self.rate:
+                    await asyncio.sleep(chunk / self.rate)
+            await response.write_eof()
+        except ConnectionResetError:
+            # The bot gave up on the download, like a cancelled preload.
+            self.aborted += 1
+        return response
+
+    async def start(self) -> str:
+        self.runner = web.AppRunner(self.web, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{self.runner.addresses[0][1]}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self.runner:
+            await self.runner.cleanup()
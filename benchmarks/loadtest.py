@@ -0,0 +1,231 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+"""
+Offline load test of the playback path.
+
+Boots the real anony package with its Telegram, PyTgCalls, MongoDB and
+download API dependencies swapped for the local fakes in benchmarks.fakes,
+then has N chats send /play, /skip and /seek through the real handlers
+and reports throughput and latency percentiles.
+
+    python -m benchmarks.loadtest --chats 500 --duration 60
+
+Pass --mongo to run against a real mongod instead of the in-memory fake.
+FFmpeg and Deno still have to be on PATH for the package to import, but
+they're never run. The bot runs in a temporary directory, so the
+downloads of the test don't mix with the real ones.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import time
+
+from benchmarks import environ, workdir
+from benchmarks.fakes import (FakeAPI, FakeAssistant, FakeBot, FakeCalls,
+                              FakeMessage, FakeMongo, FakeUser, delay)
+
+OWNER_ID = 1
+
+# action: (weight, command)
+ACTIONS = {
+    "play": (4, "/play song {0}"),
+    "skip": (3, "/skip"),
+    "seek": (3, "/seek 20"),
+}
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    if len(samples) < 2:
+        samples = samples * 2 or [0.0, 0.0]
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49] * 1000, 1),
+        "p95": round(cuts[94] * 1000, 1),
+        "p99": round(cuts[98] * 1000, 1),
+        "max": round(max(samples) * 1000, 1),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    import anony
+    from anony import anon, app, db, metrics, userbot, yt
+    from anony.core import youtube
+    from anony.helpers import Track
+    from anony.plugins import play, seek, skip
+
+    logging.getLogger("anony").setLevel(logging.WARNING)
+    handlers = {"play": play.play_hndlr, "skip": skip._skip, "seek": seek._seek}
+
+    bot = FakeBot(args.tg_latency)
+    bot.install(app)
+    app.name = "Loadtest"
+    app.username = "loadtest_bot"
+    app.id = 1
+
+    if not args.mongo:
+        FakeMongo(args.db_latency).install(db)
+    await db.connect()
+
+    userbot.clients = [FakeAssistant(num) for num in range(1, args.assistants + 1)]
+    for _ in userbot.clients:
+        client = FakeCalls(args.call_latency, args.speed)
+        anon.clients.append(client)
+        await anon.decorators(client)
+
+    api = FakeAPI(args.file_size * 1024, args.api_latency)
+    yt.api_url = await api.start()
+
+    async def search(query: str, m_id: int, video: bool = False) -> Track:
+        await delay(args.search_latency)
+        song = int(query.split()[-1])
+        duration = 120 + song % 180
+        return Track(
+            id=f"loadtest{song:03d}",
+            channel_name="Loadtest",
+            duration=time.strftime("%M:%S", time.gmtime(duration)),
+            duration_sec=duration,
+            message_id=m_id,
+            title=f"Song {song}",
+            url=f"https://www.youtube.com/watch?v=loadtest{song:03d}",
+            video=video,
+        )
+
+    def fallback(url: str, file_path: str, video: bool) -> str:
+        fallbacks.append(url)
+        return "yt-dlp is offline in the load test"
+
+    fallbacks = []
+    yt.search = search
+    youtube._fallback_download = fallback
+    metrics.boot()
+
+    latencies = {action: [] for action in ACTIONS}
+    errors: dict[str, int] = {}
+    user = FakeUser(OWNER_ID)
+    names = list(ACTIONS)
+    weights = [ACTIONS[name][0] for name in names]
+    deadline = time.monotonic() + args.duration
+
+    async def chat(chat_id: int) -> None:
+        rng = random.Random(args.seed + chat_id)
+        await asyncio.sleep(rng.uniform(0, args.think))
+        while time.monotonic() < deadline:
+            action = "play" if not await db.get_call(chat_id) else rng.choices(names, weights)[0]
+            text = ACTIONS[action][1].format(rng.randrange(args.catalog))
+            msg = FakeMessage(bot, bot.chat(chat_id), user, text)
+            start = time.perf_counter()
+            try:
+                await handlers[action](app, msg)
+                latencies[action].append(time.perf_counter() - start)
+            except Exception as ex:
+                name = f"{action}: {type(ex).__name__}"
+                errors[name] = errors.get(name, 0) + 1
+            await asyncio.sleep(rng.uniform(0, args.think * 2))
+
+    started = time.monotonic()
+    await asyncio.gather(*(chat(-1001000000000 - num) for num in range(args.chats)))
+    elapsed = time.monotonic() - started
+    peak_calls = len(db.active_calls)
+
+    for task in anony.tasks:
+        task.cancel()
+    for task in list(anon.actors.values()) + list(anon.preloads.values()):
+        task.cancel()
+    await api.stop()
+
+    total = sum(len(samples) for samples in latencies.values())
+    lag = metrics.loop_lag.quantile(0.95)
+    play_p95 = metrics.plays.quantile(0.95)
+    return {
+        "chats": args.chats,
+        "assistants": args.assistants,
+        "seconds": round(elapsed, 1),
+        "commands": total,
+        "commands_per_second": round(total / elapsed, 1),
+        "latency_ms": {
+            action: {"count": len(samples), **percentiles(samples)}
+            for action, samples in latencies.items()
+        },
+        "errors": errors,
+        "active_calls": peak_calls,
+        "streams_started": sum(client.streams for client in anon.clients),
+        "streams_ended": sum(client.ended for client in anon.clients),
+        "downloads": {
+            source: metrics.downloads.count(source=source)
+            for source in ("api", "cache")
+        },
+        "api_requests": api.requests,
+        "api_aborted": api.aborted,
+        "ytdlp_fallbacks": len(fallbacks),
+        "bot_api_calls": bot.calls,
+        "time_to_audio_p95_ms": round(play_p95 * 1000, 1) if play_p95 else None,
+        "loop_lag_p95_ms": round(lag * 1000, 1) if lag else None,
+    }
+
+
+def report(result: dict) -> None:
+    print(
+        f"\n{result['chats']} chats on {result['assistants']} assistant(s), "
+        f"{result['seconds']}s: {result['commands']} commands "
+        f"({result['commands_per_second']}/s)\n"
+    )
+    print(f"{'command':<8}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)")
+    for action, stats in result["latency_ms"].items():
+        print(
+            f"{action:<8}{stats['count']:>8}{stats['p50']:>10}{stats['p95']:>10}"
+            f"{stats['p99']:>10}{stats['max']:>10}"
+        )
+    print(
+        f"\nactive calls: {result['active_calls']}, streams started: "
+        f"{result['streams_started']}, ended: {result['streams_ended']}"
+    )
+    print(
+        f"downloads: {result['downloads']}, api requests: {result['api_requests']} "
+        f"({result['api_aborted']} aborted), yt-dlp fallbacks: {result['ytdlp_fallbacks']}"
+    )
+    print(f"time to audio p95: {result['time_to_audio_p95_ms']}ms")
+    print(f"event loop lag p95: {result['loop_lag_p95_ms']}ms")
+    print(f"bot api calls: {result['bot_api_calls']}")
+    if result["errors"]:
+        print(f"errors: {result['errors']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chats", type=int, default=100, help="number of chats")
+    parser.add_argument("--assistants", type=int, default=3, help="number of assistants")
+    parser.add_argument("--duration", type=float, default=30, help="test length in seconds")
+    parser.add_argument("--think", type=float, default=2, help="mean pause between commands of a chat")
+    parser.add_argument("--speed", type=float, default=60, help="how much faster than real time tracks end")
+    parser.add_argument("--catalog", type=int, default=200, help="number of distinct songs")
+    parser.add_argument("--file-size", type=int, default=256, help="size of the served files in KB")
+    parser.add_argument("--tg-latency", type=float, default=0.05, help="Bot API latency in seconds")
+    parser.add_argument("--call-latency", type=float, default=0.2, help="PyTgCalls latency in seconds")
+    parser.add_argument("--api-latency", type=float, default=0.3, help="download API latency in seconds")
+    parser.add_argument("--search-latency", type=float, default=0.4, help="search latency in seconds")
+    parser.add_argument("--db-latency", type=float, default=0.002, help="fake MongoDB latency in seconds")
+    parser.add_argument("--mongo", help="MongoDB URL to use instead of the fake")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    environ(OWNER_ID=str(OWNER_ID), **({"MONGO_URL": args.mongo} if args.mongo else {}))
+    workdir()
+    result = asyncio.run(run(args))
+    report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
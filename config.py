@@ -30,8 +30,23 @@ class Config:
     
         self.THUMB_GEN: bool = getenv("THUMB_GEN", "True").lower() == "true"
         self.VIDEO_PLAY: bool = getenv("VIDEO_PLAY", "True").lower() == "true"
+        self.TRANSCODE_CACHE: bool = getenv("TRANSCODE_CACHE", "False").lower() == "true"
+        self.TRANSCODE_QUOTA = int(getenv("TRANSCODE_QUOTA", 2048)) * 1024 * 1024
+
+        self.QUALITY = getenv("QUALITY", "auto").lower()
+        self.MAX_CPU_LOAD = int(getenv("MAX_CPU_LOAD", 80))
+        self.MAX_CALLS = int(getenv("MAX_CALLS", 0))
+        self.MAX_ASSISTANT_LOAD = int(getenv("MAX_ASSISTANT_LOAD", 20))
+
+        self.SERVER_HOST = getenv("SERVER_HOST", "127.0.0.1")
+        self.SERVER_PORT = int(getenv("SERVER_PORT", 8090))
+        self.TG_STREAM_SIZE = int(getenv("TG_STREAM_SIZE", 20)) * 1024 * 1024
+        self.TG_STORE_QUOTA = int(getenv("TG_STORE_QUOTA", 2048)) * 1024 * 1024
+        self.BROADCAST_RATE = int(getenv("BROADCAST_RATE", 25))
+        self.BLOCK_THRESHOLD = float(getenv("BLOCK_THRESHOLD", 1))
 
         self.LANG_CODE = getenv("LANG_CODE", "en")
+        self.WORKERS = max(int(getenv("WORKERS", 2)), 1)
 
         self.COOKIES_URL = [
             url for url in getenv("COOKIES_URL", "").split(" ")